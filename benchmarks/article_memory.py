@@ -0,0 +1,56 @@
+"""
+Bytes per article for full ISI records and for citation derived articles.
+
+Usage: python -m benchmarks.article_memory [savedrecs.txt]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from wostools.article import Article
+from wostools.exceptions import InvalidReference
+from wostools.sources.isi import _split
+
+DEFAULT_FILE = "docs/examples/bit-pattern-savedrecs.txt"
+
+
+def _measure(build, inputs):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    articles = [build(item) for item in inputs]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(articles)
+
+
+def _citation(reference):
+    try:
+        return Article.from_isi_citation(reference)
+    except InvalidReference:
+        return None
+
+
+def main(filename=DEFAULT_FILE):
+    with open(filename, encoding="utf-8-sig") as file:
+        records = list(_split(file))
+    articles = [Article.from_isi_text(raw) for raw in records]
+    # Copies, so the measurement does not count strings shared with the record
+    references = [
+        "".join(reference)
+        for article in articles
+        for reference in article.references
+        if _citation(reference) is not None
+    ]
+    del articles
+
+    full = _measure(Article.from_isi_text, records)
+    cited = _measure(Article.from_isi_citation, references)
+    print(f"  records: {full:10.0f} bytes/article ({len(records)} articles)")
+    print(f"citations: {cited:10.0f} bytes/article ({len(references)} articles)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,47 @@
+"""
+Records per second tokenizing ISI records with the regex and the sliced paths.
+
+Usage: python -m benchmarks.isi_tokenizer [savedrecs.txt]
+"""
+
+import collections
+import sys
+import timeit
+
+from wostools.article import ISI_LINE_PATTERN, _isi_fields
+from wostools.exceptions import InvalidIsiLine
+from wostools.sources.isi import _split
+
+DEFAULT_FILE = "docs/examples/bit-pattern-savedrecs.txt"
+
+
+def regex_fields(raw):
+    """The tokenizer as it was before the sliced fast path."""
+    data = collections.defaultdict(list)
+    field = None
+    for line in raw.split("\n"):
+        match = ISI_LINE_PATTERN.match(line)
+        if not match:
+            raise InvalidIsiLine(line)
+        parsed = match.groupdict()
+        field = parsed.get("field") or field
+        if not field or "value" not in parsed or parsed["value"] is None:
+            continue
+        data[field].append(parsed["value"])
+    return dict(data)
+
+
+def main(filename=DEFAULT_FILE, repeat=5):
+    with open(filename, encoding="utf-8-sig") as file:
+        records = list(_split(file))
+    for name, tokenize in [("regex", regex_fields), ("sliced", _isi_fields)]:
+        best = min(
+            timeit.repeat(
+                lambda: [tokenize(raw) for raw in records], number=1, repeat=repeat
+            )
+        )
+        print(f"{name:>8}: {len(records) / best:10.0f} records/s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,62 @@
+"""
+Time to preheat a CachedCollection over a corpus with highly cited references.
+
+Usage: python -m benchmarks.preheat [records] [references per record]
+"""
+
+import io
+import random
+import sys
+import time
+
+from wostools import CachedCollection
+
+RECORD_TEMPLATE = """PT J
+AU Author{index}, A
+   Coauthor{index}, B
+TI Some title number {index}
+SO SOME JOURNAL
+PY {year}
+J9 SOME J
+VL {volume}
+BP {page}
+DI 10.1000/record.{index}
+CR {references}
+ER"""
+
+
+def corpus(records: int, references: int, seed: int = 42) -> str:
+    """A few classic works get cited by almost every record."""
+    rng = random.Random(seed)
+    classics = [
+        f"Classic{i} A, {1950 + i}, CLASSIC J, V{i}, P{i}, DOI 10.1000/classic.{i}"
+        for i in range(20)
+    ]
+    texts = ["FN Clarivate Analytics Web of Science", "VR 1.0"]
+    for index in range(records):
+        cited = rng.sample(classics, min(references, len(classics)))
+        cited += [
+            f"Record{other}, {2000 + other % 20}, SOME J, V{other % 50}, P{other}"
+            for other in rng.sample(range(records), references)
+        ]
+        text = RECORD_TEMPLATE.format(
+            index=index,
+            year=2000 + index % 20,
+            volume=index % 50,
+            page=index,
+            references="\n   ".join(cited),
+        )
+        texts.append(text)
+    return "\n\n".join(texts) + "\n\nEF"
+
+
+def main(records=2000, references=20):
+    text = corpus(int(records), int(references))
+    start = time.perf_counter()
+    collection = CachedCollection(io.StringIO(text))
+    elapsed = time.perf_counter() - start
+    print(f"{len(collection._cache)} articles preheated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
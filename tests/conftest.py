@@ -102,3 +102,71 @@ def filename_single_document():
 @pytest.fixture
 def filename_many_documents():
     return "docs/examples/bit-pattern-savedrecs.txt"
+
+
+ISI_RECORD = (
+    "PT J\n"
+    "AU Sun, ZW\n"
+    "   Russell, TP\n"
+    "TI Some title\n"
+    "PY 2017\n"
+    "J9 J POLYM SCI POL PHYS\n"
+    "DE annealing; block copolymers\n"
+    "DI 10.1002/polb.24346\n"
+    "CR Bosworth JK, 2011, MACROMOLECULES, V44, P9196, DOI 10.1021/ma201967a\n"
+    "   Russell TP, 2000, SCIENCE, V1, P1\n"
+    "ER"
+)
+
+ISI_RECORD_CITED = (
+    "PT J\n"
+    "AU Bosworth, JK\n"
+    "PY 2011\n"
+    "J9 MACROMOLECULES\n"
+    "VL 44\n"
+    "BP 9196\n"
+    "DI 10.1021/ma201967a\n"
+    "CR Russell TP, 2000, SCIENCE, V1, P1\n"
+    "ER"
+)
+
+
+@pytest.fixture
+def isi_text():
+    """An ISI file with two records, the first one cites the second one."""
+    return f"{ISI_RECORD}\n\n{ISI_RECORD_CITED}\n\nEF"
+
+
+@pytest.fixture
+def isi_text_citing():
+    """An ISI file with the first record of `isi_text` alone."""
+    return f"{ISI_RECORD}\n\nEF"
+
+
+@pytest.fixture
+def isi_text_cited():
+    """An ISI file with the second record of `isi_text` alone."""
+    return f"{ISI_RECORD_CITED}\n\nEF"
+
+
+@pytest.fixture
+def write_file(tmp_path):
+    """Writes a text to a temporary file and gives its name."""
+
+    def write(text, name="records.txt", newline=None):
+        path = tmp_path / name
+        with open(path, "w", encoding="utf-8", newline=newline) as file:
+            file.write(text)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def dicts():
+    """Gives the full dicts of the articles of a collection, in order."""
+
+    def to_dicts(collection):
+        return [article.to_dict(simplified=False) for article in collection._articles()]
+
+    return to_dicts
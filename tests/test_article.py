@@ -5,8 +5,9 @@ from typing import Dict, Optional
 from pytest import fixture
 from pytest_bdd import given, parsers, scenarios, then, when
 
-from wostools.article import Article
+from wostools.article import Article, ArticleBuilder
 from wostools.exceptions import InvalidIsiLine, InvalidReference, MissingLabelFields
+from wostools.fields import LazyFields
 
 from wostools._testutils import Context
 
@@ -300,9 +301,9 @@ def contais_others_field(wrapper: ArticleWrapper, other: ArticleWrapper, field:
 @then("the values in the isi text are part of the article")
 def values_make_it_to_the_article(parse_context: Context[Article], attributes: dict):
     with parse_context.assert_data() as article:
+        assert article.authors == tuple(attributes["authors"])
         for field in [
             "title",
-            "authors",
             "year",
             "page",
             "journal",
@@ -318,7 +319,7 @@ def citation_values_make_it_to_article(
     citation_parse_context: Context[Article], citation_attributes: dict
 ):
     with citation_parse_context.assert_data() as article:
-        assert article.authors == [citation_attributes["author"]]
+        assert article.authors == (citation_attributes["author"],)
         for field in ["year", "journal", "page", "volume", "doi"]:
             assert str(getattr(article, field)) == citation_attributes[field]
 
@@ -354,3 +355,48 @@ def get_a_reference_dict(to_dict_context: Context[Dict], attributes: Dict):
         for key, value in article_dict.items():
             assert not value or key in attributes
             assert not value or value == attributes[key]
+
+
+def test_labels_are_computed_once():
+    article = Article(title=None, authors=["L, Robertson"], year=1999, journal="Science")
+    assert article.labels is article.labels
+
+
+def test_labels_follow_changes_to_the_article():
+    article = Article(title=None, authors=["L, Robertson"], year=1999, journal="Science")
+    assert article.label == "L Robertson, 1999, Science"
+    article.doi = "somedoi/123"
+    assert article.label == "somedoi/123"
+    assert "somedoi/123" in article.labels
+
+
+def test_builder_matches_chained_merges():
+    first = Article("A", ["Doe, J"], 2000, "J", references=["r1", "r2"], sources={1})
+    second = Article(None, ["Roe, R", "Doe, J"], 2000, "J", page="5", sources={2})
+    third = Article("C", ["Poe, P"], 1999, "J", references=["r2", "r3"], sources={3})
+    built = ArticleBuilder(first, second, third).build()
+    chained = first.merge(second).merge(third)
+    assert built.to_dict(simplified=False) == chained.to_dict(simplified=False)
+    assert built.authors == ("Doe, J", "Roe, R", "Poe, P")
+    assert built.references == ["r1", "r2", "r3"]
+
+
+def test_builder_leaves_articles_alone():
+    first = Article(None, ["Doe, J"], 2000, "J", references=["r1"])
+    ArticleBuilder(first).add(Article("A", ["Roe, R"], 2000, "J", references=["r2"]))
+    assert first.title is None
+    assert first.authors == ("Doe, J",)
+    assert first.references == ["r1"]
+
+
+def test_merged_records_and_citations_keep_their_fields_lazy():
+    record = Article.from_isi_text(
+        "PT J\nAU Doe, J\nTI A title\nPY 2000\nJ9 SOME J\nVL 1\nBP 5\nER"
+    )
+    citation = Article.from_isi_citation("Doe J, 2000, SOME J, V1, P5")
+    merged = record.merge(citation)
+    assert isinstance(merged.extra, LazyFields)
+    assert list(merged.extra._data) == ["PT", "AU", "TI", "PY", "J9", "VL", "BP", "CR"]
+    assert not merged.extra._parsed
+    assert merged.extra["title"] == "A title"
+    assert merged.extra["year"] == 2000
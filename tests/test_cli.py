@@ -0,0 +1,150 @@
+import csv
+import json
+import struct
+
+import pytest
+from click.testing import CliRunner
+
+from wostools import CachedCollection
+from wostools.cli import main
+from wostools.writers import EDGES_MAGIC, SCALAR_FIELDS
+
+
+@pytest.fixture
+def source(write_file, isi_text):
+    return write_file(isi_text, "source.txt")
+
+
+def test_to_json_streams_the_same_output(source):
+    result = CliRunner().invoke(main, ["to-json", source])
+    assert result.exit_code == 0
+    expected = [
+        article.to_dict() for article in CachedCollection.from_filenames(source)
+    ]
+    assert result.output == json.dumps(expected, indent=2)
+
+
+def test_to_json_more_gives_the_text_of_records(source):
+    result = CliRunner().invoke(main, ["to-json", "--more", source])
+    assert result.exit_code == 0
+    first, *_ = json.loads(result.output)
+    (text,) = first["sources"]
+    assert text.startswith("PT J\nAU Sun, ZW")
+
+
+def test_to_json_compact(source):
+    result = CliRunner().invoke(main, ["to-json", "--compact", source])
+    assert result.exit_code == 0
+    assert "\n" not in result.output
+    assert len(json.loads(result.output)) == 3
+
+
+def test_to_json_lines(source):
+    result = CliRunner().invoke(main, ["to-json", "--format", "jsonl", source])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    expected = [
+        article.to_dict() for article in CachedCollection.from_filenames(source)
+    ]
+    assert [json.loads(line) for line in lines] == expected
+
+
+def test_to_json_tables(tmp_path, source):
+    output = tmp_path / "articles.tsv"
+    result = CliRunner().invoke(
+        main, ["to-json", "--format", "tsv", "--output", str(output), source]
+    )
+    assert result.exit_code == 0
+    with open(output) as file:
+        header, first, *_ = csv.reader(file, delimiter="\t")
+    assert header == ["id", "label", *SCALAR_FIELDS]
+    assert first[:2] == ["0", "10.1002/polb.24346"]
+    with open(tmp_path / "articles-authors.tsv") as file:
+        rows = list(csv.reader(file, delimiter="\t"))
+    assert rows[:3] == [
+        ["id", "position", "author"],
+        ["0", "0", "Sun, ZW"],
+        ["0", "1", "Russell, TP"],
+    ]
+
+
+def test_tables_need_an_output_file(source):
+    result = CliRunner().invoke(main, ["to-json", "--format", "csv", source])
+    assert "need an --output file" in result.output
+
+
+def _label_pairs(source):
+    collection = CachedCollection.from_filenames(source)
+    return [
+        [source.label, target.label] for source, target in collection.citation_pairs()
+    ]
+
+
+def test_citation_pairs_json(source):
+    result = CliRunner().invoke(main, ["citation-pairs", source])
+    assert result.exit_code == 0
+    assert result.output == json.dumps(_label_pairs(source), indent=2)
+
+
+def test_citation_pairs_tsv(tmp_path, source):
+    output = tmp_path / "edges.tsv"
+    result = CliRunner().invoke(
+        main, ["citation-pairs", "--format", "tsv", "--output", str(output), source]
+    )
+    assert result.exit_code == 0
+    with open(tmp_path / "edges-nodes.tsv") as file:
+        _, *nodes = csv.reader(file, delimiter="\t")
+    labels = {int(id_): label for id_, label in nodes}
+    with open(output) as file:
+        header, *edges = csv.reader(file, delimiter="\t")
+    assert header == ["source", "target"]
+    pairs = [[labels[int(source)], labels[int(target)]] for source, target in edges]
+    assert sorted(pairs) == sorted(_label_pairs(source))
+
+
+def test_citation_pairs_binary(tmp_path, source):
+    nodes = tmp_path / "nodes.tsv"
+    result = CliRunner().invoke(
+        main, ["citation-pairs", "--format", "binary", "--nodes", str(nodes), source]
+    )
+    assert result.exit_code == 0
+    data = result.stdout_bytes
+    assert data[:8] == EDGES_MAGIC
+    (count,) = struct.unpack("<Q", data[8:16])
+    edges = struct.unpack(f"<{2 * count}q", data[16:])
+    assert count == len(_label_pairs(source))
+    assert len(edges) == 2 * count
+
+
+def test_integer_edges_need_somewhere_for_the_nodes(source):
+    result = CliRunner().invoke(main, ["citation-pairs", "--format", "tsv", source])
+    assert "need --nodes" in result.output
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["to-json"],
+        ["to-json", "--format", "jsonl", "--more"],
+        ["to-json", "--format", "csv"],
+        ["citation-pairs"],
+        ["citation-pairs", "--format", "tsv"],
+        ["citation-pairs", "--format", "binary"],
+    ],
+)
+def test_jobs_give_the_same_output(tmp_path, write_file, source, isi_text, arguments):
+    second = write_file(isi_text.replace("ZW", "XY"), "second.txt")
+    outputs = []
+    for jobs in ("1", "2"):
+        output = tmp_path / f"output-{jobs}.txt"
+        result = CliRunner().invoke(
+            main,
+            [*arguments, "--jobs", jobs, "--output", str(output), source, second],
+        )
+        assert result.exit_code == 0
+        # Side tables and node tables are next to the output
+        outputs.append(
+            [path.read_bytes() for path in sorted(tmp_path.glob(f"output-{jobs}*"))]
+        )
+    assert outputs[0] == outputs[1]
+    assert outputs[0][0]
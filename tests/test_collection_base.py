@@ -0,0 +1,98 @@
+import io
+import logging
+
+import pytest
+
+from wostools import sources
+from wostools.base import BaseCollection
+
+SCOPUS_TEXT = (
+    "TY  - JOUR\n"
+    "TI  - Some title\n"
+    "J2  - J Appl Phys\n"
+    "PY  - 2020\n"
+    "AU  - Pierrot, A.\n"
+    "ER  - \n"
+)
+
+
+@pytest.fixture
+def filenames(write_file, isi_text):
+    return [
+        write_file(text, f"file{index}.txt")
+        for index, text in enumerate([isi_text, SCOPUS_TEXT, isi_text])
+    ]
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_parallel_parsing_keeps_the_sequential_order(filenames, dicts, memory_map):
+    options = dict(memory_map=memory_map, locate_sources=True)
+    sequential = BaseCollection.from_filenames(*filenames, **options)
+    parallel = BaseCollection.from_filenames(*filenames, workers=2, **options)
+    assert dicts(parallel) == dicts(sequential)
+
+
+def test_parallel_parsing_can_read_sources_back(filenames):
+    collection = BaseCollection.from_filenames(
+        *filenames, workers=2, locate_sources=True
+    )
+    article = list(collection._articles())[-2]
+    (source,) = article.sources
+    assert collection.read_source(source).startswith("PT J\nAU Bosworth, JK")
+
+
+def test_parallel_parsing_handles_streams(filenames, isi_text):
+    stream = io.StringIO(isi_text)
+    collection = BaseCollection(stream, open(filenames[0]), workers=2)
+    assert len(list(collection._articles())) == 6
+
+
+@pytest.mark.parametrize(
+    "text, name",
+    [
+        ("PT J\nAU Sun, ZW\n", "isi"),
+        ("\ufeffFN Clarivate Analytics Web of Science\nVR 1.0\n", "isi"),
+        (SCOPUS_TEXT, "scopus"),
+        ("\n\nTY  - JOUR\n", "scopus"),
+    ],
+)
+def test_detect_finds_the_format(text, name):
+    parser = sources.detect(io.StringIO(text))
+    assert parser is not None
+    assert parser.name == name
+
+
+def test_detect_gives_up_on_unknown_formats():
+    assert sources.detect(io.StringIO("Something else")) is None
+
+
+def test_isi_files_are_parsed_once(isi_text):
+    collection = BaseCollection(io.StringIO(isi_text + "\n"))
+    articles = list(collection._articles())
+    assert all("scopus" not in article.sources for article in articles)
+    assert len(articles) == 3
+
+
+def test_files_of_unknown_formats_are_skipped(caplog, isi_text):
+    collection = BaseCollection(
+        io.StringIO("Something else\nPT J\nAU Sun, ZW\nER\n"), io.StringIO(isi_text)
+    )
+    with caplog.at_level(logging.WARNING, logger="wostools"):
+        assert len(list(collection._articles())) == 3
+    assert "unknown format" in caplog.text
+
+
+def test_sources_can_be_read_while_parsing(write_file, isi_text, dicts):
+    records, _ = isi_text.rsplit("EF", 1)
+    # Longer than a chunk, so reading sources moves the file under the parser
+    filename = write_file(records * 500 + "EF")
+    expected = dicts(BaseCollection.from_filenames(filename, locate_sources=True))
+    collection = BaseCollection.from_filenames(filename, locate_sources=True)
+    articles, texts = [], {}
+    for article in collection._articles():
+        for source in article.sources:
+            texts[source] = collection.read_source(source)
+        articles.append(article.to_dict(simplified=False))
+    assert articles == expected
+    assert texts == {source: collection.read_source(source) for source in texts}
+    assert len(set(texts.values())) == 3
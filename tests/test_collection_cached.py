@@ -1,4 +1,5 @@
 import io
+import itertools
 from typing import List, Dict, Tuple
 
 from pytest import fixture
@@ -388,3 +389,147 @@ def iterate_over_citation_pairs_two_isi_files(
                 having_keywords = bool(article.keywords and reference.keywords)
 
         assert having_keywords
+
+
+def test_repeated_citations_are_parsed_once():
+    collection = CachedCollection(io.StringIO(ISI_TEXT), io.StringIO(ISI_TEXT))
+    info = collection.citation_cache_info
+    assert info.misses == info.currsize
+    assert info.hits == info.misses
+
+
+def test_citation_cache_is_bounded():
+    collection = CachedCollection(io.StringIO(ISI_TEXT), citation_cache_size=4)
+    assert collection.citation_cache_info.currsize == 4
+
+
+def _pairs(collection):
+    return sorted(
+        (article.label, reference.label)
+        for article, reference in collection.citation_pairs()
+    )
+
+
+def test_added_files_match_a_full_build():
+    full = CachedCollection(
+        io.StringIO(ISI_TEXT), io.StringIO(ISI_TEXT_DIFFERENT_RECORD)
+    )
+    collection = CachedCollection(io.StringIO(ISI_TEXT))
+    collection.add_files(io.StringIO(ISI_TEXT_DIFFERENT_RECORD))
+    assert sorted(article.label for article in collection) == sorted(
+        article.label for article in full
+    )
+    assert _pairs(collection) == _pairs(full)
+
+
+def test_added_files_are_the_only_ones_parsed():
+    collection = CachedCollection(io.StringIO(ISI_TEXT))
+    before = collection.citation_cache_info.misses
+    collection.add_files(io.StringIO(ISI_TEXT))
+    info = collection.citation_cache_info
+    assert info.misses == before
+    assert info.hits == before
+
+
+def test_added_articles_are_merged_with_their_citations():
+    collection = CachedCollection(io.StringIO(ISI_TEXT))
+    record, *_ = CachedCollection(io.StringIO(ISI_TEXT_DIFFERENT_RECORD))._articles()
+    (cited,) = [article for article in collection if article.doi == record.doi]
+    collection.add_articles(record)
+    (merged,) = [article for article in collection if article.doi == record.doi]
+    assert not cited.keywords
+    assert merged.keywords
+    assert merged.sources == cited.sources | record.sources
+
+
+def test_citation_graph_matches_citation_pairs():
+    collection = CachedCollection(
+        io.StringIO(ISI_TEXT), io.StringIO(ISI_TEXT_DIFFERENT_RECORD)
+    )
+    graph = collection.citation_graph()
+    edges = sorted(
+        (graph.nodes[source], graph.nodes[target])
+        for source, target in graph.citing.edges()
+    )
+    assert edges == _pairs(collection)
+    assert sorted(graph.cited_by.edges()) == sorted(
+        (target, source) for source, target in graph.citing.edges()
+    )
+
+
+def test_coauthor_graph_counts_shared_articles_once():
+    collection = CachedCollection(io.StringIO(ISI_TEXT), io.StringIO(ISI_TEXT))
+    graph = collection.coauthor_graph()
+    pairs = {(author, coauthor): weight for author, coauthor, weight in graph.pairs()}
+    assert len(pairs) == len(set(collection.coauthors))
+    assert all(weight == 1 for weight in pairs.values())
+    assert sorted(graph.edges.transpose().edges()) == sorted(graph.edges.edges())
+    assert collection.coauthor_graph() is graph
+
+
+def test_query_keeps_up_with_added_files():
+    collection = CachedCollection(io.StringIO(ISI_TEXT), indexed=True)
+    (cited,) = collection.query(doi="10.1021/MA201967A")
+    assert not cited.keywords
+    collection.add_files(io.StringIO(ISI_TEXT_DIFFERENT_RECORD))
+    (merged,) = collection.query(doi="https://doi.org/10.1021/ma201967a")
+    assert merged.keywords
+    assert merged in collection.query(author="Bosworth, JK", year=(2010, 2012))
+    assert cited not in collection.query(author="Bosworth, JK")
+
+
+def test_query_builds_the_indexes_on_demand():
+    collection = CachedCollection(io.StringIO(ISI_TEXT))
+    articles = collection.query(year=(None, 2000))
+    assert articles
+    assert all(article.year <= 2000 for article in articles)
+
+
+def test_coauthors_come_from_the_records_only():
+    collection = CachedCollection(
+        io.StringIO(ISI_TEXT), io.StringIO(ISI_TEXT_DIFFERENT_RECORD)
+    )
+    record, *_ = CachedCollection(io.StringIO(ISI_TEXT_DIFFERENT_RECORD))._articles()
+    (merged,) = [article for article in collection if article.doi == record.doi]
+    # The citation of the record adds its own spelling of the first author
+    assert set(merged.authors) > set(record.authors)
+    expected = {
+        pair
+        for article in collection._articles()
+        for pair in itertools.combinations(sorted(article.authors), 2)
+    }
+    assert set(collection.coauthors) == expected
+    graph = collection.coauthor_graph()
+    assert {tuple(sorted(pair[:2])) for pair in graph.pairs()} == expected
+
+
+def test_coauthors_of_records_in_several_formats_count_once():
+    isi = (
+        "PT J\n"
+        "AU Sun, ZW\n"
+        "   Russell, TP\n"
+        "PY 2017\n"
+        "J9 J APPL PHYS\n"
+        "DI 10.1/x\n"
+        "ER\n"
+        "\n"
+        "EF"
+    )
+    scopus = (
+        "TY  - JOUR\n"
+        "J2  - J Appl Phys\n"
+        "PY  - 2017\n"
+        "DO  - 10.1/x\n"
+        "AU  - Sun, Z.W.\n"
+        "AU  - Russell, T.P.\n"
+        "DB  - Scopus\n"
+        "ER  - \n"
+    )
+    collection = CachedCollection(io.StringIO(isi), io.StringIO(scopus))
+    (merged,) = collection
+    assert len(merged.authors) == 4
+    (pair,) = collection.coauthors
+    assert pair in {("Russell, TP", "Sun, ZW"), ("Russell, T.P.", "Sun, Z.W.")}
+    ((*authors, count),) = collection.coauthor_graph().pairs()
+    assert tuple(sorted(authors)) == pair
+    assert count == 1
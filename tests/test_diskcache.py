@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from wostools.base import BaseCollection
+from wostools.diskcache import ParseCache
+
+
+@pytest.fixture
+def filename(write_file, isi_text):
+    return write_file(isi_text, "file.txt")
+
+
+@pytest.fixture
+def parse_cache(tmp_path):
+    return ParseCache(str(tmp_path / "cache"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_cached_files_load_the_same_articles(
+    filename, parse_cache, dicts, workers, memory_map
+):
+    options = dict(locate_sources=True, memory_map=memory_map, workers=workers)
+    expected = dicts(BaseCollection.from_filenames(filename, **options))
+    first = BaseCollection.from_filenames(filename, parse_cache=parse_cache, **options)
+    assert dicts(first) == expected
+    assert parse_cache.size() > 0
+    second = BaseCollection.from_filenames(filename, parse_cache=parse_cache, **options)
+    assert dicts(second) == expected
+
+
+def test_cached_sources_point_to_the_right_file(write_file, filename, parse_cache):
+    other = write_file("PT J\nAU Doe, J\nPY 2000\nJ9 J\nER\n", "other.txt")
+    options = dict(locate_sources=True, parse_cache=parse_cache)
+    list(BaseCollection.from_filenames(filename, **options)._articles())
+    collection = BaseCollection.from_filenames(other, filename, **options)
+    article = list(collection._articles())[-2]
+    (source,) = article.sources
+    assert source.file == 1
+    assert collection.read_source(source).startswith("PT J\nAU Bosworth, JK")
+
+
+def test_changed_files_are_parsed_again(filename, parse_cache, isi_text):
+    list(BaseCollection.from_filenames(filename, parse_cache=parse_cache)._articles())
+    with open(filename, "w") as file:
+        file.write(isi_text.replace("2017", "2018"))
+    collection = BaseCollection.from_filenames(filename, parse_cache=parse_cache)
+    assert next(iter(collection._articles())).year == 2018
+
+
+def test_unreadable_entries_are_dropped(filename, parse_cache):
+    key = parse_cache.key(filename)
+    parse_cache.set(key, (None, [], []))
+    with open(os.path.join(parse_cache.directory, f"{key}.pickle"), "wb") as file:
+        file.write(b"garbage")
+    assert parse_cache.get(key) is None
+    assert key not in parse_cache
+
+
+def test_eviction_keeps_the_most_recent_entries(filename, parse_cache):
+    parse_cache.set("old", (None, [], []))
+    os.utime(os.path.join(parse_cache.directory, "old.pickle"), (0, 0))
+    parse_cache.set("new", (None, [], []))
+    parse_cache.max_size = parse_cache.size() - 1
+    parse_cache.evict()
+    assert "new" in parse_cache
+    assert "old" not in parse_cache
+
+
+def test_eviction_by_age(parse_cache):
+    parse_cache.set("old", (None, [], []))
+    os.utime(os.path.join(parse_cache.directory, "old.pickle"), (0, 0))
+    parse_cache.max_age = 60
+    parse_cache.evict()
+    assert "old" not in parse_cache
+
+
+def test_clear_removes_everything(parse_cache):
+    parse_cache.set("entry", (None, [], []))
+    parse_cache.clear()
+    assert parse_cache.size() == 0
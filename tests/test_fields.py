@@ -1,6 +1,14 @@
 import pytest
 
-from wostools.fields import joined, delimited, integer, parse
+from wostools.fields import (
+    LazyFields,
+    delimited,
+    integer,
+    joined,
+    merge_fields,
+    parse,
+    parse_all,
+)
 
 
 def test_joined_joins_sequences():
@@ -36,3 +44,70 @@ def test_parse_includes_on_unknown_fields():
 def test_parse_raises_on_invalid_values():
     with pytest.raises(ValueError):
         assert parse("PY", ["1994b"]) == {}
+
+
+def test_parse_stores_values_under_the_tag_only():
+    assert parse("PY", ["1994"]) == {"PY": 1994}
+
+
+def test_parse_all_resolves_aliases():
+    fields = parse_all({"CR": ["Doe J, 1994, SCIENCE"], "ED": ["Doe"], "BE": ["Roe"]})
+    assert fields["references"] is fields["CR"]
+    assert fields["cited_references"] == ["Doe J, 1994, SCIENCE"]
+    assert fields["editors"] == ["Roe"]
+    assert list(fields) == [
+        "CR",
+        "cited_references",
+        "references",
+        "citations",
+        "ED",
+        "editors",
+        "BE",
+    ]
+    assert "citations" in fields
+    assert "DOI" not in fields
+
+
+def test_lazy_fields_match_parse_all():
+    raw = {"PY": ["1994"], "AU": ["Doe, J", "Roe, R"], "FG": ["value"]}
+    assert dict(LazyFields(dict(raw))) == parse_all(dict(raw))
+
+
+def test_lazy_fields_only_parse_what_is_used():
+    fields = LazyFields({"PY": ["1994b"], "AU": ["Doe, J"]})
+    assert fields["authors"] == ["Doe, J"]
+    assert "year" in fields
+    with pytest.raises(ValueError):
+        fields["year"]
+
+
+def test_lazy_fields_memoize_values():
+    fields = LazyFields({"CR": ["Doe J, 1994, SCIENCE"]})
+    assert fields["references"] is fields["CR"]
+
+
+def test_lazy_fields_peek_does_not_memoize():
+    fields = LazyFields({"AU": ["Doe, J"]})
+    assert fields.peek("authors") == ["Doe, J"]
+    assert fields.peek("title", "missing") == "missing"
+    assert fields.peek("authors") is not fields.peek("authors")
+
+
+def test_merge_fields_prefers_the_second():
+    first = LazyFields({"PY": ["1994"], "TI": ["first"]})
+    second = LazyFields({"TI": ["second"]})
+    assert first["title"] == "first"
+    merged = merge_fields(first, second)
+    assert merged["title"] == "second"
+    assert merged["year"] == 1994
+
+
+def test_merge_fields_takes_many_mappings():
+    first = LazyFields({"PY": ["1994"], "TI": ["first"]})
+    second = LazyFields({"TI": ["second"]})
+    third = LazyFields({"TI": ["third"], "SO": ["journal"]})
+    assert first["title"] == "first"
+    merged = merge_fields(first, second, third)
+    assert merged["title"] == "third"
+    assert merged["year"] == 1994
+    assert merged["publication_name"] == "journal"
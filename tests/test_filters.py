@@ -0,0 +1,106 @@
+import io
+
+import pytest
+
+from wostools.base import BaseCollection
+from wostools.filters import RecordFilter
+
+RECORD = (
+    "PT J\n"
+    "AU Sun, ZW\n"
+    "   Russell, TP\n"
+    "LA English\n"
+    "DT Article; Proceedings Paper\n"
+    "PY 2017\n"
+    "J9 J POLYM SCI POL PHYS\n"
+    "DI 10.1002/polb.24346"
+)
+
+
+@pytest.mark.parametrize(
+    "record_filter, accepted",
+    [
+        (RecordFilter(years=(2015, 2020)), True),
+        (RecordFilter(years=(2018, None)), False),
+        (RecordFilter(years=(None, 2017)), True),
+        (RecordFilter(document_types=["proceedings paper"]), True),
+        (RecordFilter(document_types=["Review"]), False),
+        (RecordFilter(languages=["English"]), True),
+        (RecordFilter(languages=["Spanish"]), False),
+        (RecordFilter(fields=["DI", "authors"]), True),
+        (RecordFilter(fields=["keywords"]), False),
+        (RecordFilter(fields=["DOI", "publication_year"]), True),
+        (RecordFilter(years=(2017, 2017), languages=["Spanish"]), False),
+    ],
+)
+def test_accepts_isi(record_filter, accepted):
+    assert record_filter.accepts_isi(RECORD) is accepted
+
+
+def test_unknown_fields_are_refused():
+    with pytest.raises(ValueError):
+        RecordFilter(fields=["doi"])
+
+
+def test_missing_fields_are_not_accepted():
+    assert not RecordFilter(years=(2000, 2020)).accepts_isi("PT J\nAU Sun, ZW")
+    assert not RecordFilter(languages=["English"]).accepts_isi("EF")
+
+
+def test_accepts_ris():
+    data = {"PY": ["2020"], "M3": ["Article"], "LA": ["English"]}
+    assert RecordFilter(years=(2020, None), document_types=["article"]).accepts_ris(
+        data
+    )
+    assert not RecordFilter(languages=["French"]).accepts_ris(data)
+    assert not RecordFilter(fields=["DO"]).accepts_ris(data)
+
+
+@pytest.mark.parametrize("field", ["DOI", "DI", "DO", "authors", "year"])
+def test_ris_records_are_checked_on_the_same_fields(field):
+    data = {"PY": ["2020"], "AU": ["Pierrot, A."], "DO": ["10.1063/5.0020407"]}
+    assert RecordFilter(fields=[field]).accepts_ris(data)
+    assert not RecordFilter(fields=[field]).accepts_ris({"TI": ["Some title"]})
+
+
+def test_isi_fields_missing_in_ris_are_refused():
+    with pytest.raises(ValueError):
+        RecordFilter(fields=["UT"]).accepts_ris({"PY": ["2020"]})
+
+
+def test_mixed_collections_keep_records_of_both_formats():
+    scopus = "TY  - JOUR\nPY  - 2020\nDO  - 10.1063/5.0020407\nDB  - Scopus\nER  - \n"
+    collection = BaseCollection(
+        io.StringIO(f"{RECORD}\nER\n\nEF"),
+        io.StringIO(scopus),
+        record_filter=RecordFilter(fields=["DOI"]),
+    )
+    assert [article.doi for article in collection._articles()] == [
+        "10.1002/polb.24346",
+        "10.1063/5.0020407",
+    ]
+
+
+def test_repr_is_stable():
+    first = RecordFilter(document_types=["b", "a", "c"])
+    second = RecordFilter(document_types=["c", "b", "a"])
+    assert repr(first) == repr(second)
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_collections_leave_out_filtered_records(tmp_path, memory_map):
+    older = RECORD.replace("PY 2017", "PY 1999")
+    path = tmp_path / "records.txt"
+    path.write_text(f"{RECORD}\nER\n\n{older}\nER\n\nEF", encoding="utf-8")
+    collection = BaseCollection.from_filenames(
+        str(path), memory_map=memory_map, record_filter=RecordFilter(years=(2000, None))
+    )
+    assert [article.year for article in collection._articles()] == [2017]
+
+
+def test_filtered_records_are_never_parsed():
+    stream = io.StringIO(
+        f"{RECORD}\nER\n\nPT J\nINVALIDKEY This value is going to die\nPY 1999\nER\n"
+    )
+    collection = BaseCollection(stream, record_filter=RecordFilter(years=(2000, None)))
+    assert len(list(collection._articles())) == 1
@@ -0,0 +1,36 @@
+from array import array
+
+from wostools.graph import CSR
+
+
+def _csr(size, edges):
+    offsets = array("q", [0])
+    indices = array("q")
+    for node in range(size):
+        indices.extend(target for source, target in edges if source == node)
+        offsets.append(len(indices))
+    return CSR(offsets, indices)
+
+
+def test_transpose_reverses_every_edge():
+    edges = [(0, 1), (0, 2), (1, 2), (2, 0), (3, 2)]
+    csr = _csr(4, edges)
+    assert list(csr.edges()) == edges
+    transposed = csr.transpose()
+    assert sorted(transposed.edges()) == sorted((b, a) for a, b in edges)
+    assert list(transposed.neighbors(2)) == [0, 1, 3]
+    assert transposed.transpose() == csr
+
+
+def test_transpose_keeps_weights():
+    csr = CSR(array("q", [0, 2, 2]), array("q", [1, 0]), array("q", [5, 7]))
+    transposed = csr.transpose()
+    assert list(transposed.offsets) == [0, 1, 2]
+    assert list(transposed.indices) == [0, 0]
+    assert list(transposed.weights) == [7, 5]
+
+
+def test_from_counts_sorts_the_rows():
+    csr = CSR.from_counts(3, {(2, 0): 1, (0, 2): 4, (0, 1): 2})
+    assert list(csr.edges()) == [(0, 1), (0, 2), (2, 0)]
+    assert list(csr.weights) == [2, 4, 1]
@@ -0,0 +1,46 @@
+from wostools.article import Article
+from wostools.index import ArticleIndex, normalize_doi
+
+
+def _index(*articles):
+    cache = {article.label: article for article in articles}
+    index = ArticleIndex(cache)
+    for label, article in cache.items():
+        index.add(label, article)
+    return index
+
+
+FIRST = Article(None, ["Doe, J", "Roe, R"], 2015, "NATURE", doi="10.1/ONE")
+SECOND = Article(None, ["Doe, J"], 2019, "SCIENCE")
+THIRD = Article(None, ["Roe, R"], 2021, "Nature")
+
+
+def test_normalize_doi():
+    assert normalize_doi(" https://doi.org/10.1/ABC ") == "10.1/abc"
+    assert normalize_doi("doi:10.1/abc") == "10.1/abc"
+
+
+def test_query_intersects_the_filters():
+    index = _index(FIRST, SECOND, THIRD)
+    assert index.query(author="doe, j") == {FIRST.label, SECOND.label}
+    assert index.query(author="Roe, R", journal="nature") == {
+        FIRST.label,
+        THIRD.label,
+    }
+    assert index.query(author="Roe, R", year=2021) == {THIRD.label}
+    assert index.query(doi="https://doi.org/10.1/one") == {FIRST.label}
+    assert index.query() == set()
+
+
+def test_query_year_ranges():
+    index = _index(FIRST, SECOND, THIRD)
+    assert index.query(year=(2015, 2020)) == {FIRST.label, SECOND.label}
+    assert index.query(year=(2016, None)) == {SECOND.label, THIRD.label}
+    assert index.query(author="Roe, R", year=(None, 2020)) == {FIRST.label}
+
+
+def test_removed_articles_are_not_found():
+    index = _index(FIRST, SECOND)
+    index.remove(SECOND.label, SECOND)
+    assert index.query(author="Doe, J") == {FIRST.label}
+    assert index.query(year=2019) == set()
@@ -0,0 +1,130 @@
+import io
+
+import pytest
+
+from wostools import CachedCollection
+from wostools.exceptions import InvalidSnapshot, MissingSource
+from wostools.snapshot import NONE, Snapshot, SnapshotArticles, SnapshotMapping
+
+
+def _state(collection):
+    return (
+        [(article.to_dict(), article.sources) for article in collection],
+        dict(collection._refs),
+        dict(collection._ids),
+    )
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "collection.snapshot")
+
+
+def test_loaded_collections_match_the_saved_ones(path, isi_text_citing, isi_text_cited):
+    collection = CachedCollection(
+        io.StringIO(isi_text_citing), io.StringIO(isi_text_cited)
+    )
+    collection.save(path)
+    loaded = CachedCollection.load(path)
+    assert _state(loaded) == _state(collection)
+    assert len(loaded._cache) == len(collection._cache)
+    assert loaded.citation_graph() == collection.citation_graph()
+    assert list(loaded.coauthors) == list(collection.coauthors)
+    assert [a.label for a in loaded.query(author="bosworth, jk")] == [
+        "10.1021/ma201967a"
+    ]
+
+
+def test_loaded_collections_take_new_files(path, isi_text_citing, isi_text_cited):
+    CachedCollection(io.StringIO(isi_text_citing)).save(path)
+    loaded = CachedCollection.load(path)
+    loaded.add_files(io.StringIO(isi_text_cited))
+    expected = CachedCollection(
+        io.StringIO(isi_text_citing), io.StringIO(isi_text_cited)
+    )
+    assert _state(loaded)[1:] == _state(expected)[1:]
+    assert sorted(loaded.coauthors) == sorted(expected.coauthors)
+    assert sorted(a.label for a in loaded) == sorted(a.label for a in expected)
+    (merged,) = [a for a in loaded if a.doi == "10.1021/ma201967a"]
+    assert merged.references == ["Russell TP, 2000, SCIENCE, V1, P1"]
+
+
+def test_loaded_collections_can_be_saved_over(path, isi_text_citing, isi_text_cited):
+    CachedCollection(io.StringIO(isi_text_citing)).save(path)
+    loaded = CachedCollection.load(path)
+    loaded.add_files(io.StringIO(isi_text_cited))
+    loaded.save(path)
+    assert _state(CachedCollection.load(path)) == _state(loaded)
+
+
+def test_snapshot_mappings_keep_changes_in_memory(path, isi_text_citing):
+    CachedCollection(io.StringIO(isi_text_citing)).save(path)
+    articles = SnapshotArticles(Snapshot(path))
+    first, second, *_ = list(articles)
+    del articles[first]
+    assert first not in articles
+    articles[second] = articles[first] = articles[second]
+    assert list(articles)[0] == second
+    assert list(articles)[-1] == first
+    assert len(articles) == len(list(articles.items()))
+    with pytest.raises(KeyError):
+        del articles["nothing"]
+
+
+def test_invalid_snapshots_are_refused(tmp_path):
+    path = tmp_path / "collection.snapshot"
+    path.write_bytes(b"PT J\nER\n" * 100)
+    with pytest.raises(InvalidSnapshot):
+        CachedCollection.load(str(path))
+
+
+def _sources(collection):
+    return {
+        source: collection.read_source(source)
+        for article in collection
+        for source in article.sources
+    }
+
+
+def test_loaded_collections_read_sources_from_their_files(
+    path, write_file, isi_text_citing, isi_text_cited
+):
+    filename = write_file(isi_text_citing)
+    collection = CachedCollection.from_filenames(filename)
+    collection.save(path)
+    loaded = CachedCollection.load(path)
+    assert _sources(loaded) == _sources(collection)
+    loaded.add_files(io.StringIO(isi_text_cited))
+    (record,) = [a for a in loaded if a.doi == "10.1021/ma201967a"]
+    location, *_ = [s for s in record.sources if not isinstance(s, str)]
+    assert location.file == 1
+    assert loaded.read_source(location).startswith("PT J\nAU Bosworth, JK")
+    assert _sources(loaded).items() >= _sources(collection).items()
+
+
+def test_sources_of_changed_files_are_missing(
+    path, write_file, isi_text_citing, isi_text_cited
+):
+    CachedCollection.from_filenames(write_file(isi_text_citing)).save(path)
+    write_file(isi_text_cited)
+    loaded = CachedCollection.load(path)
+    (record,) = [a for a in loaded if a.doi == "10.1002/polb.24346"]
+    with pytest.raises(MissingSource):
+        loaded.read_source(next(iter(record.sources)))
+
+
+def test_sources_of_unnamed_files_are_missing(path, isi_text_citing):
+    CachedCollection(io.StringIO(isi_text_citing)).save(path)
+    loaded = CachedCollection.load(path)
+    (record,) = [a for a in loaded if a.doi == "10.1002/polb.24346"]
+    with pytest.raises(MissingSource):
+        loaded.read_source(next(iter(record.sources)))
+
+
+def test_snapshot_mappings_need_every_lookup():
+    class Incomplete(SnapshotMapping):
+        def _position(self, key):
+            return NONE
+
+    with pytest.raises(TypeError):
+        Incomplete(None)
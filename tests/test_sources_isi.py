@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from wostools.article import _match_isi_line, _tokenize_isi_line
+from wostools.exceptions import InvalidIsiLine
+from wostools.sources import SourceLocation
+from wostools.sources.isi import _records, _split, parse_file, read_record
+
+
+@pytest.fixture
+def savedrecs(isi_text):
+    return "FN Thomson Reuters Web of Science™\nVR 1.0\n" + isi_text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_split_matches_whole_file_split(chunk_size, savedrecs):
+    expected = [part for part in savedrecs.split("\n\n") if part != "ER"]
+    assert list(_split(io.StringIO(savedrecs), chunk_size)) == expected
+
+
+@pytest.mark.parametrize("text", ["", "ER", "a\n\n\nb", "a\n\n\n\nb\n\n", "ER\n\nER"])
+def test_split_handles_odd_separators(text):
+    expected = [part for part in text.split("\n\n") if part != "ER"]
+    assert list(_split(io.StringIO(text), 2)) == expected
+
+
+def test_split_is_lazy(savedrecs):
+    file = io.StringIO(savedrecs)
+    records = _split(file, 16)
+    next(records)
+    assert file.tell() < len(savedrecs)
+
+
+def test_parse_file_yields_articles(savedrecs):
+    articles = list(parse_file(io.StringIO(savedrecs)))
+    assert [article.year for article in articles[:2]] == [2017, 2011]
+
+
+def test_parse_file_can_locate_sources(savedrecs):
+    article, *_ = parse_file(io.StringIO(savedrecs), file_id=3)
+    (source,) = article.sources
+    assert source == SourceLocation(3, 0, savedrecs.index("\n\n"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_read_record_reads_back_every_record(chunk_size, savedrecs):
+    file = io.StringIO(savedrecs)
+    checkpoints = []
+    records = list(_records(file, chunk_size, checkpoints))
+    for offset, raw in records:
+        assert read_record(file, checkpoints, offset, len(raw)) == raw
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "AU Sun, ZW",
+        "   Russell, TP",
+        "    Indented, too much",
+        "ER",
+        "AB ",
+        "   ",
+        "\ufeffFN Clarivate Analytics Web of Science",
+        "nullAU Sun, ZW",
+    ],
+)
+def test_tokenize_isi_line_matches_the_regex(line):
+    assert _tokenize_isi_line(line) == _match_isi_line(line)
+
+
+def test_tokenize_isi_line_rejects_invalid_lines():
+    with pytest.raises(InvalidIsiLine):
+        _tokenize_isi_line("INVALIDKEY This value is going to die")
@@ -0,0 +1,42 @@
+import pytest
+
+from wostools.base import BaseCollection
+from wostools.sources import SourceLocation
+from wostools.sources.isi import _split
+from wostools.sources.mapped import MappedFile
+
+
+@pytest.fixture(params=["\n", "\r\n"])
+def filename(write_file, isi_text, request):
+    text = "\ufeffFN Thomson Reuters Web of Science™\nVR 1.0\n" + isi_text
+    return write_file(text, "savedrecs.txt", newline=request.param)
+
+
+def test_mapped_file_indexes_the_same_records(filename):
+    with open(filename, encoding="utf-8-sig") as file:
+        expected = list(_split(file))
+    assert list(MappedFile(filename)) == expected
+
+
+def test_mapped_file_random_access(filename):
+    mapped = MappedFile(filename)
+    assert len(mapped) == 3
+    assert mapped[1].startswith("PT J\nAU Bosworth, JK")
+    assert mapped[2] == "EF"
+
+
+def test_mapped_file_handles_empty_files(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert list(MappedFile(str(path))) == [""]
+
+
+def test_memory_mapped_collection_reads_sources_back(filename):
+    collection = BaseCollection.from_filenames(
+        filename, memory_map=True, locate_sources=True
+    )
+    mapped = MappedFile(filename)
+    for index, article in enumerate(collection._articles()):
+        (source,) = article.sources
+        assert source == SourceLocation(0, *mapped.location(index))
+        assert collection.read_source(source) == mapped[index]
@@ -0,0 +1,93 @@
+import io
+import sqlite3
+
+import pytest
+
+from wostools import CachedCollection
+from wostools.storage import LRUMapping, MappedList, SqliteMapping, SqliteStorage
+
+
+@pytest.fixture
+def backend():
+    return SqliteMapping(sqlite3.connect(""), "items")
+
+
+def test_sqlite_mapping_round_trips(backend):
+    backend["a"] = {"some": ["value"]}
+    backend[1] = "one"
+    assert backend["a"] == {"some": ["value"]}
+    assert 1 in backend
+    assert list(backend) == ["a", 1]
+    del backend["a"]
+    assert len(backend) == 1
+    with pytest.raises(KeyError):
+        backend["a"]
+
+
+def test_lru_mapping_spills_to_the_backend(backend):
+    mapping = LRUMapping(backend, 4)
+    for index in range(10):
+        mapping[index] = str(index)
+    assert len(mapping._front) <= 4
+    assert 0 in backend
+    assert mapping[0] == "0"
+    assert dict(mapping.items()) == {index: str(index) for index in range(10)}
+    del mapping[3]
+    assert 3 not in mapping
+    assert len(mapping) == 9
+
+
+def test_lru_mapping_keeps_the_latest_value(backend):
+    mapping = LRUMapping(backend, 2)
+    mapping["key"] = "old"
+    mapping.flush()
+    mapping["key"] = "new"
+    assert mapping["key"] == "new"
+    mapping.flush()
+    assert backend["key"] == "new"
+
+
+def test_mapped_list():
+    names = MappedList({})
+    names.append("first")
+    names.append("second")
+    assert len(names) == 2
+    assert names[1] == "second"
+
+
+def test_spilled_collections_match_memory_ones(isi_text):
+    memory = CachedCollection(io.StringIO(isi_text))
+    spilled = CachedCollection(io.StringIO(isi_text), storage=SqliteStorage(memory=2))
+    assert sorted(article.label for article in spilled) == sorted(
+        article.label for article in memory
+    )
+    assert sorted(
+        (article.label, reference.label)
+        for article, reference in spilled.citation_pairs()
+    ) == sorted(
+        (article.label, reference.label)
+        for article, reference in memory.citation_pairs()
+    )
+    assert spilled.query(author="Russell TP", year=2000)
+    assert _graph_edges(spilled) == _graph_edges(memory)
+
+
+def _graph_edges(collection):
+    graph = collection.citation_graph()
+    return sorted(
+        (graph.nodes[source], graph.nodes[target])
+        for source, target in graph.citing.edges()
+    )
+
+
+def test_sqlite_storage_starts_from_scratch(tmp_path, isi_text):
+    path = str(tmp_path / "collection.db")
+    first = SqliteStorage(path)
+    CachedCollection(io.StringIO(isi_text), storage=first)
+    first.flush()
+    first.close()
+    second = CachedCollection(io.StringIO(isi_text), storage=SqliteStorage(path))
+    memory = CachedCollection(io.StringIO(isi_text))
+    assert sorted(article.label for article in second) == sorted(
+        article.label for article in memory
+    )
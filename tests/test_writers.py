@@ -0,0 +1,50 @@
+import io
+import json
+from array import array
+
+import pytest
+
+from wostools.graph import CSR
+from wostools.writers import write_edges, write_json
+
+ITEMS = [
+    {"title": "Some\ntitle", "authors": ["Sun, ZW", "Russell, TP"], "year": 2017},
+    {"title": None, "authors": [], "extra": {"nested": [1, {"deep": "ñ"}]}},
+    [],
+    "text",
+]
+
+
+@pytest.mark.parametrize("items", [ITEMS, ITEMS[:1], []])
+def test_write_json_matches_json_dump(items):
+    output = io.StringIO()
+    write_json(iter(items), output)
+    assert output.getvalue() == json.dumps(items, indent=2)
+
+
+@pytest.mark.parametrize("items", [ITEMS, []])
+def test_write_json_compact(items):
+    output = io.StringIO()
+    write_json(iter(items), output, compact=True)
+    assert output.getvalue() == json.dumps(items, separators=(",", ":"))
+
+
+def test_write_json_in_parallel():
+    items = [{"id": index, "text": "ñ\n" * (index % 3)} for index in range(3000)]
+    output = io.StringIO()
+    write_json(iter(items), output, jobs=2)
+    assert output.getvalue() == json.dumps(items, indent=2)
+
+
+def test_write_edges_in_chunks():
+    edges = CSR(array("q", [0, 2, 2, 5, 6]), array("q", [1, 2, 0, 1, 3, 2]))
+    outputs = []
+    for chunk_size in (1, 3, 1 << 16):
+        output = io.StringIO()
+        write_edges(edges, output, chunk_size=chunk_size)
+        outputs.append(output.getvalue())
+    assert outputs[0].splitlines() == [
+        "source\ttarget",
+        *(f"{source}\t{target}" for source, target in edges.edges()),
+    ]
+    assert outputs[0] == outputs[1] == outputs[2]
@@ -1,10 +1,21 @@
 import collections
 import logging
 import re
-from typing import Any, List, Mapping, Optional, Set
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from wostools.exceptions import InvalidIsiLine, InvalidReference, MissingLabelFields
-from wostools.fields import parse_all
+from wostools.fields import Fields, LazyFields, merge_fields
 
 logger = logging.getLogger(__name__)
 
@@ -24,41 +35,110 @@ ISI_CITATION_PATTERN = re.compile(
     re.X,
 )
 
+ISI_FIELD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+
+
+def _match_isi_line(line: str):
+    match = ISI_LINE_PATTERN.match(line)
+    if not match:
+        raise InvalidIsiLine(line)
+    parsed = match.groupdict()
+    return parsed.get("field"), parsed.get("value")
+
+
+def _tokenize_isi_line(line: str):
+    """Splits an ISI line into its field tag and value.
+
+    Well formed lines are either a two character tag followed by a space and
+    the value, or a continuation with three spaces before the value. Those are
+    sliced directly, anything else goes through ``ISI_LINE_PATTERN``.
+    """
+    if line[:3] == "   ":
+        if len(line) > 3 and line[3] != " ":
+            return None, line[3:]
+    elif (
+        line[:1] in ISI_FIELD_CHARS
+        and line[1:2] in ISI_FIELD_CHARS
+        and (len(line) == 2 or line[2] == " ")
+    ):
+        return line[:2], line[3:] if len(line) > 2 else None
+    return _match_isi_line(line)
+
+
+def _isi_fields(raw: str) -> Dict[str, List[str]]:
+    data: Dict[str, List[str]] = collections.defaultdict(list)
+    field = None
+    for line in raw.split("\n"):
+        if not line:
+            # Blank lines only show up around records, like after EF
+            continue
+        key, value = _tokenize_isi_line(line)
+        field = key or field
+        if not field or value is None:
+            continue
+        data[field].append(value)
+    return dict(data)
+
+
+# Shared by every article without extra fields, it can't be modified anyway
+EMPTY_FIELDS = Fields({})
+
 
 class Article:
+    # Collections hold millions of these, mostly built from citations, so they
+    # skip the instance dict and share immutable empty containers.
+    __slots__ = (
+        "title",
+        "authors",
+        "keywords",
+        "year",
+        "journal",
+        "volume",
+        "issue",
+        "page",
+        "doi",
+        "references",
+        "sources",
+        "extra",
+        "_label_cache",
+    )
+
     def __init__(
         self,
         title: Optional[str],
-        authors: List[str],
+        authors: Sequence[str],
         year: Optional[int],
         journal: Optional[str],
         volume: Optional[str] = None,
         issue: Optional[str] = None,
         page: Optional[str] = None,
         doi: Optional[str] = None,
-        references: Optional[List[str]] = None,
-        keywords: Optional[List[str]] = None,
-        sources: Optional[Set[str]] = None,
+        references: Optional[Sequence[str]] = None,
+        keywords: Optional[Sequence[str]] = None,
+        sources: Optional[AbstractSet[Hashable]] = None,
         extra: Optional[Mapping] = None,
     ):
         self.title: Optional[str] = title
-        self.authors: List[str] = authors
-        self.keywords: List[str] = keywords or []
+        self.authors: Tuple[str, ...] = tuple(authors) if authors else ()
+        self.keywords: Tuple[str, ...] = tuple(keywords) if keywords else ()
         self.year: Optional[int] = year
         self.journal: Optional[str] = journal
         self.volume: Optional[str] = volume
         self.issue: Optional[str] = issue
         self.page: Optional[str] = page
         self.doi: Optional[str] = doi
-        self.references: List[str] = references or []
-        self.sources: Set[str] = sources or set()
-        self.extra: Mapping[str, Any] = extra or {}
+        self.references: Sequence[str] = references or ()
+        self.sources: AbstractSet[Hashable] = (
+            frozenset(sources) if sources else frozenset()
+        )
+        self.extra: Mapping[str, Any] = extra or EMPTY_FIELDS
+        self._label_cache: Optional[Tuple[Tuple, str, FrozenSet[str]]] = None
 
     @property
     def label(self) -> str:
         if self.doi:
             return self.doi
-        return self._label()
+        return self._labels()[0]
 
     def _label(self, exclude_doi=False, lower_p=False) -> str:
         if not (self.authors and self.year and self.journal):
@@ -74,17 +154,42 @@ class Article:
         }
         return ", ".join(value for value in pieces.values() if value)
 
-    @property
-    def labels(self) -> Set[str]:
-        if not self.doi:
-            return {self.label, self._label(lower_p=True)}
-        return {
+    def _labels(self) -> Tuple[str, FrozenSet[str]]:
+        """The label without the doi shortcut and all the labels, memoized.
+
+        The memo is keyed by the fields that make up the labels, so assigning
+        any of them computes the labels again.
+        """
+        key = (
+            self.authors[0] if self.authors else None,
+            self.year,
+            self.journal,
+            self.volume,
+            self.page,
             self.doi,
-            self.label,
-            self._label(exclude_doi=True),
-            self._label(lower_p=True),
-            self._label(exclude_doi=True, lower_p=True),
-        }
+        )
+        cache = self._label_cache
+        if cache is not None and cache[0] == key:
+            return cache[1], cache[2]
+        label = self._label()
+        if not self.doi:
+            labels = frozenset({label, self._label(lower_p=True)})
+        else:
+            labels = frozenset(
+                {
+                    self.doi,
+                    label,
+                    self._label(exclude_doi=True),
+                    self._label(lower_p=True),
+                    self._label(exclude_doi=True, lower_p=True),
+                }
+            )
+        self._label_cache = (key, label, labels)
+        return label, labels
+
+    @property
+    def labels(self) -> FrozenSet[str]:
+        return self._labels()[1]
 
     def to_dict(self, simplified=True):
         """
@@ -92,17 +197,18 @@ class Article:
         """
         extra = (
             {
-                "references": self.references,
-                "extra": self.extra,
-                "sources": list(self.sources),
+                "references": list(self.references),
+                "extra": dict(self.extra),
+                # Sets iterate in an order that changes from process to process
+                "sources": sorted(self.sources, key=repr),
             }
             if not simplified
             else {}
         )
         return {
             "title": self.title,
-            "authors": self.authors,
-            "keywords": self.keywords,
+            "authors": list(self.authors),
+            "keywords": list(self.keywords),
             "year": self.year,
             "journal": self.journal,
             "volume": self.volume,
@@ -123,51 +229,25 @@ class Article:
                     ]
                 )
             )
-        return Article(
-            title=self.title or other.title,
-            authors=(
-                self.authors
-                + [author for author in other.authors if author not in self.authors]
-            ),
-            year=self.year or other.year,
-            journal=self.journal or other.journal,
-            volume=self.volume or other.volume,
-            issue=self.issue or other.issue,
-            page=self.page or other.page,
-            doi=self.doi or other.doi,
-            sources={*self.sources, *other.sources},
-            extra={**self.extra, **other.extra},
-            references=list({*self.references, *other.references}),
-            keywords=list({*self.keywords, *other.keywords}),
-        )
+        return ArticleBuilder(self).add(other).build()
 
     @classmethod
-    def from_isi_text(cls, raw: str) -> "Article":
-        data = collections.defaultdict(list)
-        field = None
-        for line in raw.split("\n"):
-            match = ISI_LINE_PATTERN.match(line)
-            if not match:
-                raise InvalidIsiLine(line)
-            parsed = match.groupdict()
-            field = parsed.get("field") or field
-            if not field or "value" not in parsed or parsed["value"] is None:
-                continue
-            data[field].append(parsed["value"])
-        processed = parse_all(dict(data))
+    def from_isi_text(cls, raw: str, source: Optional[Hashable] = None) -> "Article":
+        processed = LazyFields(_isi_fields(raw))
+        # The article keeps these values itself, no need to memoize them twice
         return cls(
-            title=processed.get("title"),
-            authors=processed.get("authors", []),
-            year=processed.get("year"),
-            journal=processed.get("source_abbreviation"),
-            volume=processed.get("volume"),
-            issue=processed.get("issue"),
-            page=processed.get("beginning_page"),
-            doi=processed.get("DOI"),
-            references=processed.get("references"),
-            keywords=processed.get("keywords"),
+            title=processed.peek("title"),
+            authors=processed.peek("authors", ()),
+            year=processed.peek("year"),
+            journal=processed.peek("source_abbreviation"),
+            volume=processed.peek("volume"),
+            issue=processed.peek("issue"),
+            page=processed.peek("beginning_page"),
+            doi=processed.peek("DOI"),
+            references=processed.peek("references"),
+            keywords=processed.peek("keywords"),
             extra=processed,
-            sources={raw},
+            sources={raw if source is None else source},
         )
 
     @classmethod
@@ -175,16 +255,65 @@ class Article:
         match = ISI_CITATION_PATTERN.match(reference)
         if not match:
             raise InvalidReference(reference)
-        data = {key: [value] for key, value in match.groupdict().items() if value}
-        processed = parse_all(data)
+        data = {key: (value,) for key, value in match.groupdict().items() if value}
+        # Lazy like the fields of records, so merging both keeps them lazy
+        processed = LazyFields(data)
         return cls(
-            title=processed.get("title"),
-            authors=processed.get("authors", []),
-            year=processed.get("year"),
-            journal=processed.get("source_abbreviation"),
-            volume=processed.get("volume"),
-            page=processed.get("beginning_page"),
-            doi=processed.get("DOI"),
+            title=processed.peek("title"),
+            authors=processed.peek("authors", []),
+            year=processed.peek("year"),
+            journal=processed.peek("source_abbreviation"),
+            volume=processed.peek("volume"),
+            page=processed.peek("beginning_page"),
+            doi=processed.peek("DOI"),
             extra=processed,
             sources={reference},
         )
+
+
+class ArticleBuilder:
+    """Merges any number of articles into one in linear time.
+
+    Adding articles one after the other gives the same result as chaining
+    `Article.merge`: the first truthy value of each field wins, and authors,
+    references, keywords and sources keep the order in which they first show
+    up, without building a new article for every step. The added articles are
+    never modified, so they may well be shared.
+    """
+
+    _SCALARS = ("title", "year", "journal", "volume", "issue", "page", "doi")
+
+    def __init__(self, *articles: Article):
+        self._values: Dict[str, Any] = dict.fromkeys(self._SCALARS)
+        self._authors: Dict[str, None] = {}
+        self._references: Dict[str, None] = {}
+        self._keywords: Dict[str, None] = {}
+        self._sources: Dict[Hashable, None] = {}
+        self._extras: List[Mapping] = []
+        for article in articles:
+            self.add(article)
+
+    def add(self, article: Article) -> "ArticleBuilder":
+        values = self._values
+        for name in self._SCALARS:
+            if not values[name]:
+                values[name] = getattr(article, name)
+        self._authors.update(dict.fromkeys(article.authors))
+        self._references.update(dict.fromkeys(article.references))
+        self._keywords.update(dict.fromkeys(article.keywords))
+        self._sources.update(dict.fromkeys(article.sources))
+        if article.extra:
+            self._extras.append(article.extra)
+        return self
+
+    def build(self) -> Article:
+        # Like in merge, the extra fields of later articles take precedence
+        extra = merge_fields(*self._extras) if self._extras else None
+        return Article(
+            **self._values,
+            authors=tuple(self._authors),
+            references=list(self._references),
+            keywords=tuple(self._keywords),
+            sources=self._sources.keys(),
+            extra=extra,
+        )
@@ -4,50 +4,145 @@ Base collection for a shared API.
 
 import glob
 import logging
-from typing import Iterable, Iterator, TextIO, Tuple
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
 
 from wostools.article import Article
-from wostools.exceptions import InvalidReference, WosToolsError
-from wostools.sources import isi, scopus
+from wostools.diskcache import Entry, ParseCache
+from wostools.exceptions import InvalidReference, MissingSource
+from wostools.filters import RecordFilter
+from wostools import sources
+from wostools.sources import SourceLocation, isi
+from wostools.sources.mapped import MappedFile
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_file(
+    file,
+    file_id: Optional[int] = None,
+    checkpoints: Optional[isi.Checkpoints] = None,
+    record_filter: Optional[RecordFilter] = None,
+) -> Iterable[Article]:
+    parser = sources.detect(file)
+    if parser is None:
+        # Running every parser would read the file twice, and articles twice
+        logger.warning(f"Skipping {getattr(file, 'name', file)}, unknown format")
+        return
+    yield from parser.parse(file, file_id, checkpoints, record_filter)
+
+
+def _parse_filename(
+    filename: str,
+    encoding: Optional[str],
+    file_id: Optional[int],
+    record_filter: Optional[RecordFilter] = None,
+) -> Tuple[List[Article], isi.Checkpoints]:
+    """Parses a whole file in a worker process, `encoding` is None if mapped."""
+    checkpoints: isi.Checkpoints = []
+    if encoding is None:
+        file = MappedFile(filename)
+    else:
+        file = open(filename, encoding=encoding)
+    try:
+        articles = _parse_file(file, file_id, checkpoints, record_filter)
+        return list(articles), checkpoints
+    finally:
+        file.close()
+
+
+def _relocate(articles: Iterable[Article], file_id: int):
+    """Points the located sources of the articles to another file id."""
+    for article in articles:
+        article.sources = frozenset(
+            (
+                source._replace(file=file_id)
+                if isinstance(source, SourceLocation)
+                else source
+            )
+            for source in article.sources
+        )
+
+
 class BaseCollection:
     """
     A collection of WOS text files.
     """
 
-    def __init__(self, *files):
-        self._files = files
+    def __init__(
+        self,
+        *files,
+        locate_sources: bool = False,
+        workers: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        record_filter: Optional[RecordFilter] = None,
+    ):
+        """
+        Args:
+            files (TextIO): Open WOS or scopus files.
+            locate_sources (bool): Keep the location of each ISI record in
+                `Article.sources` instead of its raw text, read it back with
+                `read_source`.
+            workers (int): Number of processes used to parse files opened by
+                name, one file per task.
+            parse_cache (ParseCache): Keep the articles of files opened by name
+                on disk, unchanged files are loaded from there next time.
+            record_filter (RecordFilter): Leave out the records that don't
+                pass it, before parsing them.
+        """
+        self._files = list(files)
+        self._locate_sources = locate_sources
+        self._workers = workers
+        self._parse_cache = parse_cache
+        self._record_filter = record_filter
+        self._checkpoints: Dict[int, isi.Checkpoints] = {}
         for file in self._files:
             file.seek(0)
 
     @classmethod
-    def from_glob(cls, pattern):
+    def from_glob(cls, pattern, **kwargs):
         """Creates a new collection from a pattern using glob.
 
         Args:
             pattern (str): String with the pattern to be passed to glob.
+            kwargs: Options for the collection.
 
         Returns:
             BaseCollection: Collection with the articles by using the pattern.
         """
-        return cls.from_filenames(*glob.glob(pattern))
+        return cls.from_filenames(*glob.glob(pattern), **kwargs)
 
     @classmethod
-    def from_filenames(cls, *filenames):
+    def from_filenames(cls, *filenames, memory_map: bool = False, **kwargs):
         """Creates a new collection from a list of filenames.
 
         Args:
             filenames (str): String with the filename.
+            memory_map (bool): Map the files in memory and index their records
+                instead of reading them as text streams.
+            kwargs: Options for the collection.
 
         Returns:
             BaseCollection: Collection with the articles by reading the
                 filenames.
         """
-        files = [open(filename, encoding="utf-8-sig") for filename in filenames]
-        return cls(*files)
+        if memory_map:
+            files = [MappedFile(filename) for filename in filenames]
+        else:
+            files = [open(filename, encoding="utf-8-sig") for filename in filenames]
+        return cls(*files, **kwargs)
 
     @property
     def _iter_files(self) -> Iterable[TextIO]:
@@ -61,12 +156,122 @@ class BaseCollection:
             yield filehandle
             filehandle.seek(0)
 
-    def _articles(self) -> Iterable[Article]:
-        for file in self._iter_files:
-            try:
-                yield from isi.parse_file(file)
-            except WosToolsError:
-                yield from scopus.parse_file(file)
+    def _parse_file(self, index: int, file) -> Iterable[Article]:
+        if not self._locate_sources:
+            return _parse_file(file, record_filter=self._record_filter)
+        checkpoints = self._checkpoints[index] = []
+        return _parse_file(file, index, checkpoints, self._record_filter)
+
+    def _parse_cache_key(self, file) -> Optional[str]:
+        if self._parse_cache is None:
+            return None
+        name = getattr(file, "name", None)
+        if not isinstance(name, str) or not os.path.isfile(name):
+            return None
+        encoding = None if isinstance(file, MappedFile) else file.encoding
+        return self._parse_cache.key(
+            name, encoding, self._locate_sources, self._record_filter
+        )
+
+    def _cached_articles(self, index: int, entry: Entry) -> Iterable[Article]:
+        file_id, articles, checkpoints = entry
+        if self._locate_sources:
+            self._checkpoints[index] = checkpoints
+            if file_id != index:
+                _relocate(articles, index)
+        return articles
+
+    def _file_articles(
+        self, index: int, file, key: Optional[str] = None
+    ) -> Iterable[Article]:
+        key = key or self._parse_cache_key(file)
+        if key is None or self._parse_cache is None:
+            return self._parse_file(index, file)
+        entry = self._parse_cache.get(key)
+        if entry is None:
+            articles = list(self._parse_file(index, file))
+            file_id = index if self._locate_sources else None
+            entry = (file_id, articles, self._checkpoints.get(index, []))
+            self._parse_cache.set(key, entry)
+        return self._cached_articles(index, entry)
+
+    def _articles(self, start: int = 0) -> Iterable[Article]:
+        """Parses the files from index `start` on, all of them by default."""
+        if self._workers > 1:
+            yield from self._parallel_articles(start)
+            return
+        for index, file in enumerate(self._files[start:], start):
+            file.seek(0)
+            yield from self._file_articles(index, file)
+
+    def _parallel_articles(self, start: int = 0) -> Iterable[Article]:
+        """Parses the files in a process pool, keeping their order.
+
+        Only a few files are parsed ahead of the one being consumed, files that
+        can't be opened again by name are parsed in this process.
+        """
+        pending: Deque[Tuple[int, Optional[Future], Optional[str]]] = deque()
+
+        def collect():
+            index, future, key = pending.popleft()
+            if future is None:
+                file = self._files[index]
+                file.seek(0)
+                yield from self._file_articles(index, file, key)
+                file.seek(0)
+                return
+            articles, checkpoints = future.result()
+            if self._locate_sources:
+                self._checkpoints[index] = checkpoints
+            if key is not None and self._parse_cache is not None:
+                file_id = index if self._locate_sources else None
+                self._parse_cache.set(key, (file_id, articles, checkpoints))
+            yield from articles
+
+        with ProcessPoolExecutor(self._workers) as executor:
+            for index, file in enumerate(self._files[start:], start):
+                name = getattr(file, "name", None)
+                future = None
+                key = self._parse_cache_key(file)
+                # Cached files load faster here than sent back from a worker
+                cached = self._parse_cache is not None and key in self._parse_cache
+                if not cached and isinstance(name, str) and os.path.isfile(name):
+                    encoding = None
+                    if not isinstance(file, MappedFile):
+                        encoding = file.encoding
+                    file_id = index if self._locate_sources else None
+                    future = executor.submit(
+                        _parse_filename, name, encoding, file_id, self._record_filter
+                    )
+                pending.append((index, future, key))
+                while len(pending) > 2 * self._workers:
+                    yield from collect()
+            while pending:
+                yield from collect()
+
+    def read_source(self, source: Hashable) -> str:
+        """Reads the raw text of one of the sources of an article.
+
+        Args:
+            source: An item from `Article.sources`.
+
+        Returns:
+            str: The raw text, sources that aren't locations are returned as is.
+
+        Raises:
+            MissingSource: When the file of a location isn't there anymore.
+        """
+        if not isinstance(source, SourceLocation):
+            return source
+        file = None
+        if 0 <= source.file < len(self._files):
+            file = self._files[source.file]
+        if file is None:
+            raise MissingSource(source)
+        if isinstance(file, MappedFile):
+            return file.decode(source.offset, source.length)
+        checkpoints = self._checkpoints.get(source.file, [])
+        return isi.read_record(file, checkpoints, source.offset, source.length)
 
     def __iter__(self) -> Iterator[Article]:
         """
@@ -2,67 +2,339 @@
 Collection with a nice cache.
 """
 
+import functools
 import itertools
 import logging
+from array import array
+from collections import Counter
 from contextlib import suppress
-from typing import Dict, Iterable, Iterator, Set, Tuple
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
 
-from wostools.article import Article
+from wostools.article import Article, ArticleBuilder
 from wostools.base import BaseCollection
+from wostools.diskcache import ParseCache
 from wostools.exceptions import InvalidReference, MissingLabelFields
+from wostools.filters import RecordFilter
+from wostools.graph import CSR, CitationGraph, CoauthorGraph
+from wostools.index import ArticleIndex, Years
+from wostools.snapshot import (
+    Snapshot,
+    SnapshotArticles,
+    SnapshotIds,
+    SnapshotNames,
+    SnapshotRecordAuthors,
+    SnapshotRefs,
+    describe_file,
+    reopen_file,
+    write_snapshot,
+)
+from wostools.sources import SourceLocation
+from wostools.storage import MemoryStorage, Storage
 
 logger = logging.getLogger(__name__)
 
+# The same references show up over and over, keep this many of them parsed
+CITATION_CACHE_SIZE = 1 << 16
+
+
+def _citation(reference: str) -> Optional[Article]:
+    try:
+        return Article.from_isi_citation(reference)
+    except InvalidReference:
+        return None
+
 
 class CachedCollection(BaseCollection):
     """
     A collection of WOS text files.
     """
 
-    def __init__(self, *files):
-        super().__init__(*files)
-        self._cache_key = None
-        self._cache: Dict[str, Article] = {}
-        self._labels: Dict[str, Set[str]] = {}
-        self._refs: Dict[str, str] = {}
+    def __init__(
+        self,
+        *files,
+        locate_sources: bool = True,
+        workers: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        record_filter: Optional[RecordFilter] = None,
+        citation_cache_size: Optional[int] = CITATION_CACHE_SIZE,
+        indexed: bool = False,
+        storage: Optional[Storage] = None,
+    ):
+        """
+        Args:
+            files (TextIO): Open WOS or scopus files.
+            locate_sources (bool): Keep record locations instead of their text.
+            workers (int): Number of processes used to parse the files.
+            parse_cache (ParseCache): Keep parsed files on disk for next time.
+            record_filter (RecordFilter): Leave out records, and what they
+                cite, before parsing them.
+            citation_cache_size (int): How many parsed citations to keep around,
+                `None` for no limit.
+            indexed (bool): Index the articles by author, year, journal and
+                DOI right away, instead of on the first `query`.
+            storage (Storage): Where to keep the articles and their labels,
+                in memory by default. `SqliteStorage` bounds the memory used
+                by spilling to disk.
+        """
+        super().__init__(
+            *files,
+            locate_sources=locate_sources,
+            workers=workers,
+            parse_cache=parse_cache,
+            record_filter=record_filter,
+        )
+        self._citation = functools.lru_cache(maxsize=citation_cache_size)(_citation)
+        self._storage: Storage = storage or MemoryStorage()
+        self._cache: MutableMapping[str, Article] = self._storage.mapping("cache")
+        self._refs: MutableMapping[str, str] = self._storage.mapping("refs")
+        # Union-find over interned labels, labels of the same article are joined
+        self._ids: MutableMapping[str, int] = self._storage.mapping("ids")
+        self._names = self._storage.list("names")
+        self._parents = array("q")
+        self._sizes = array("q")
+        # Each set is also a circular linked list, to walk over its labels
+        self._next = array("q")
+        # Authors of the newest parsed record in each cluster, without the
+        # spellings citations use, by the label of the merged article
+        self._authors: MutableMapping[str, Tuple[str, ...]] = self._storage.mapping(
+            "authors"
+        )
+        self._pending: List[Tuple[int, Article, bool]] = []
+        # Descriptions of the files of a loaded snapshot, see `load`
+        self._saved_files: List[Optional[Dict[str, Any]]] = []
+        self._coauthor_graph: Optional[CoauthorGraph] = None
+        self._index: Optional[ArticleIndex] = None
+        if indexed:
+            self._index = ArticleIndex(self._cache)
         self._preheat()
 
-    def _add_article(self, article: Article):
-        existing_labels = {
-            alias
-            for label in article.labels
-            for alias in self._labels.get(label, set())
-        }
-        all_labels = existing_labels | article.labels
-        existing_refs = {
-            self._refs[label] for label in all_labels if label in self._refs
-        }
-        for ref in existing_refs:
-            other = self._cache.pop(ref, None)
-            if other is not None:
-                article = article.merge(other)
-
-        self._cache[article.label] = article
-        for label in all_labels:
-            self._labels[label] = all_labels
-            self._refs[label] = article.label
+    def _intern(self, label: str) -> int:
+        id_ = self._ids.get(label)
+        if id_ is None:
+            id_ = self._ids[label] = len(self._parents)
+            self._names.append(label)
+            self._parents.append(id_)
+            self._sizes.append(1)
+            self._next.append(id_)
+        return id_
 
-    def _preheat(self):
-        # Preheat our cache
-        key = ":".join(str(id(file) for file in self._files))
-        if key == self._cache_key:
-            return
-        for article in self._articles():
+    def _find(self, id_: int) -> int:
+        parents = self._parents
+        while parents[id_] != id_:
+            # Path halving, every node on the way points to its grandparent
+            parents[id_] = parents[parents[id_]]
+            id_ = parents[id_]
+        return id_
+
+    def _union(self, first: int, second: int) -> int:
+        first, second = self._find(first), self._find(second)
+        if first == second:
+            return first
+        if self._sizes[first] < self._sizes[second]:
+            first, second = second, first
+        self._parents[second] = first
+        self._sizes[first] += self._sizes[second]
+        # Splices both circular lists into one
+        self._next[first], self._next[second] = self._next[second], self._next[first]
+        return first
+
+    def _members(self, root: int) -> Iterator[int]:
+        id_ = root
+        while True:
+            yield id_
+            id_ = self._next[id_]
+            if id_ == root:
+                return
+
+    def _add_article(self, article: Article, record: bool = False):
+        """Joins the labels of an article, merging happens in `_resolve`."""
+        first, *others = (self._intern(label) for label in article.labels)
+        for other in others:
+            self._union(first, other)
+        self._pending.append((first, article, record))
+
+    def _resolve(self):
+        """Merges the articles added since the last time into their clusters.
+
+        Only clusters with new articles are merged again, along with the
+        articles they already had, the rest of the collection is left alone.
+        """
+        clusters: Dict[int, List[Tuple[Article, bool]]] = {}
+        for id_, article, record in self._pending:
+            clusters.setdefault(self._find(id_), []).append((article, record))
+        self._pending = []
+
+        for root, added in clusters.items():
+            labels = [self._names[id_] for id_ in self._members(root)]
+            # Newer articles take precedence, as if each was merged on arrival
+            added.reverse()
+            articles = [article for article, _ in added]
+            authors = [article.authors for article, record in added if record]
+            for canonical in dict.fromkeys(
+                self._refs[label] for label in labels if label in self._refs
+            ):
+                # Clusters resolved before, possibly several joined by now
+                previous = self._cache.pop(canonical, None)
+                if previous is not None:
+                    articles.append(previous)
+                    self._unindex(canonical, previous)
+                previous_authors = self._authors.pop(canonical, None)
+                if previous_authors is not None:
+                    authors.append(previous_authors)
+            merged = articles[0]
+            if len(articles) > 1:
+                merged = ArticleBuilder(*articles).build()
+            self._unindex(merged.label, self._cache.get(merged.label))
+            self._cache[merged.label] = merged
+            if authors:
+                # One record is enough, formats spell the same people apart
+                self._authors[merged.label] = tuple(authors[0])
+            if self._index is not None:
+                self._index.add(merged.label, merged)
+            for label in labels:
+                self._refs[label] = merged.label
+
+    def _unindex(self, label: str, article: Optional[Article]):
+        if self._index is not None and article is not None:
+            self._index.remove(label, article)
+
+    def _ingest(self, articles: Iterable[Article]):
+        batch_size = self._storage.batch_size
+        for article in articles:
             with suppress(MissingLabelFields):
-                self._add_article(article)
+                self._add_article(article, record=True)
                 for reference in article.references:
-                    try:
-                        self._add_article(Article.from_isi_citation(reference))
-                    except InvalidReference:
+                    citation = self._citation(reference)
+                    if citation is None:
                         logger.info(
                             f"Ignoring malformed reference '{reference}' from '{article.label}'"
                         )
-        self._cache_key = key
+                        continue
+                    self._add_article(citation)
+            if batch_size is not None and len(self._pending) >= batch_size:
+                self._resolve()
+        self._resolve()
+        self._coauthor_graph = None
+
+    def _preheat(self):
+        # Preheat our cache
+        self._ingest(self._articles())
+
+    def add_files(self, *files):
+        """Parses new files and merges their articles into the collection.
+
+        Only the new files are parsed, and only the articles that share a
+        label with theirs are merged again.
+
+        Args:
+            files (TextIO): Open WOS or scopus files.
+        """
+        start = len(self._files)
+        self._files.extend(files)
+        self._ingest(self._articles(start))
+
+    def add_articles(self, *articles: Article):
+        """Merges articles, and the references they cite, into the collection.
+
+        Args:
+            articles (Article): Articles parsed somewhere else.
+        """
+        self._ingest(articles)
+
+    def save(self, path: str):
+        """Writes the merged articles and their labels to a snapshot file.
+
+        The snapshot keeps everything the collection knows after merging,
+        `load` brings it back without parsing any file.
+
+        Args:
+            path (str): Where to write the snapshot, replaced atomically.
+        """
+        write_snapshot(
+            path,
+            self._cache.items(),
+            self._authors,
+            [self._names[id_] for id_ in range(len(self._names))],
+            self._refs,
+            self._parents,
+            self._sizes,
+            self._next,
+            [
+                (
+                    self._saved_files[index]
+                    if file is None
+                    else describe_file(file, self._checkpoints.get(index, []))
+                )
+                for index, file in enumerate(self._files)
+            ],
+        )
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "CachedCollection":
+        """Opens a collection saved with `save`.
+
+        The snapshot is mapped in memory and articles are built from it as
+        they are read, so loading takes about the same time for any size.
+        Changes, like `add_files`, are kept in memory on top of it. The files
+        of the saved collection are opened again the first time `read_source`
+        needs them, as long as they didn't change.
+
+        Args:
+            path (str): The snapshot file.
+            kwargs: Options for the collection, like `citation_cache_size`.
+
+        Returns:
+            CachedCollection: The collection, without any files.
+        """
+        collection = cls(**kwargs)
+        snapshot = Snapshot(path)
+        collection._cache = SnapshotArticles(snapshot)
+        collection._authors = SnapshotRecordAuthors(snapshot)
+        collection._refs = SnapshotRefs(snapshot)
+        collection._ids = SnapshotIds(snapshot)
+        collection._names = SnapshotNames(snapshot)
+        # The union-find changes as labels are added, these are copied
+        collection._parents = snapshot.copy("parents")
+        collection._sizes = snapshot.copy("sizes")
+        collection._next = snapshot.copy("next")
+        # Added files get ids after the saved ones
+        collection._saved_files = snapshot.files
+        collection._files = [None] * len(snapshot.files)
+        if collection._index is not None:
+            collection._build_index()
+        return collection
+
+    def read_source(self, source: Hashable) -> str:
+        if isinstance(source, SourceLocation):
+            self._reopen(source.file)
+        return super().read_source(source)
+
+    def _reopen(self, index: int):
+        if not 0 <= index < len(self._saved_files) or self._files[index] is not None:
+            return
+        reopened = reopen_file(self._saved_files[index])
+        if reopened is not None:
+            self._files[index], self._checkpoints[index] = reopened
+
+    @property
+    def citation_cache_info(self):
+        """Hits, misses and size of the parsed citations cache.
+
+        Returns:
+            functools._CacheInfo: The same named tuple `functools.lru_cache`
+                uses for its statistics.
+        """
+        return self._citation.cache_info()
 
     def __iter__(self) -> Iterator[Article]:
         """Iterates over all articles.
@@ -70,7 +342,6 @@ class CachedCollection(BaseCollection):
         Returns:
             generator: A generator of Articles according to the text articles.
         """
-        self._preheat()
         yield from self._cache.values()
 
     @property
@@ -92,11 +363,37 @@ class CachedCollection(BaseCollection):
             generator: A generator with the pair of coauthors of the articles
                 in the collections.
         """
-        for article in self._articles():
-            yield from (
-                (source, target)
-                for source, target in itertools.combinations(sorted(article.authors), 2)
+        # Merged records, duplicates only count once
+        for authors in self._authors.values():
+            yield from itertools.combinations(sorted(authors), 2)
+
+    def coauthor_graph(self) -> CoauthorGraph:
+        """Computes the coauthorship network, weighted by articles in common.
+
+        Duplicated articles are counted once, since they are merged already,
+        and only the authors of parsed records count, citations spell their
+        names in their own way. The graph is kept until more articles are
+        added to the collection.
+
+        Returns:
+            CoauthorGraph: The authors along with compressed sparse rows for
+                their coauthors and the number of articles they share.
+        """
+        if self._coauthor_graph is not None:
+            return self._coauthor_graph
+        ids: Dict[str, int] = {}
+        counts: Counter = Counter()
+        for record_authors in self._authors.values():
+            authors = sorted(
+                {ids.setdefault(author, len(ids)) for author in record_authors}
             )
+            counts.update(itertools.combinations(authors, 2))
+        for (author, coauthor), count in list(counts.items()):
+            counts[coauthor, author] = count
+        self._coauthor_graph = CoauthorGraph(
+            list(ids), CSR.from_counts(len(ids), counts)
+        )
+        return self._coauthor_graph
 
     def citation_pairs(self) -> Iterable[Tuple[Article, Article]]:
         """Computes the citation pairs for the articles in the collection.
@@ -111,3 +408,58 @@ class CachedCollection(BaseCollection):
                 if reference in self._refs:
                     label = self._refs[reference]
                     yield (article, self._cache[label])
+
+    def query(
+        self,
+        author: Optional[str] = None,
+        year: Optional[Years] = None,
+        journal: Optional[str] = None,
+        doi: Optional[str] = None,
+    ) -> List[Article]:
+        """Finds the articles matching every filter given, using indexes.
+
+        The indexes are built on the first query unless the collection was
+        created with `indexed=True`, and kept up to date afterwards.
+
+        Args:
+            author (str): One of the authors, regardless of case.
+            year (int or tuple): The year, or an inclusive `(start, end)`
+                range where either end can be `None`.
+            journal (str): The journal, as in `Article.journal`, regardless
+                of case.
+            doi (str): The DOI, with or without a `https://doi.org/` prefix.
+
+        Returns:
+            list: The matching articles, sorted by label.
+        """
+        if self._index is None:
+            self._build_index()
+        labels = self._index.query(author=author, year=year, journal=journal, doi=doi)
+        return [self._cache[label] for label in sorted(labels)]
+
+    def _build_index(self):
+        self._index = ArticleIndex(self._cache)
+        for label, article in self._cache.items():
+            self._index.add(label, article)
+
+    def citation_graph(self) -> CitationGraph:
+        """Computes the citation network with articles numbered from zero.
+
+        Has the same edges as `citation_pairs`, built in a single pass over
+        the collection without a tuple per edge.
+
+        Returns:
+            CitationGraph: The labels of the articles along with compressed
+                sparse rows for the citations going out of and into each one.
+        """
+        ids = {label: index for index, label in enumerate(self._cache)}
+        offsets = array("q", [0])
+        targets = array("q")
+        for article in self._cache.values():
+            for reference in article.references:
+                label = self._refs.get(reference)
+                if label is not None and label in ids:
+                    targets.append(ids[label])
+            offsets.append(len(targets))
+        citing = CSR(offsets, targets)
+        return CitationGraph(list(ids), citing, citing.transpose())
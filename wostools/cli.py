@@ -1,18 +1,108 @@
-import json
 import logging
+import operator
+import os
+from contextlib import ExitStack
 
 import click
 
 from wostools import CachedCollection
+from wostools.diskcache import ParseCache, default_directory
+from wostools.writers import (
+    table_names,
+    write_binary_edges,
+    write_edges,
+    write_json,
+    write_jsonl,
+    write_nodes,
+    write_tables,
+)
+
+TABLE_DELIMITERS = {"csv": ",", "tsv": "\t"}
 
 
 @click.group()
-def main():
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    show_default=True,
+    help="Keep parsed files on disk and load unchanged ones from there.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar="WOSTOOLS_CACHE_DIR",
+    default=default_directory,
+    show_default=True,
+    help="Where to keep the parsed files.",
+)
+@click.option(
+    "--cache-max-size",
+    type=int,
+    default=None,
+    help="Megabytes to keep at most, least recently used files go first.",
+)
+@click.option(
+    "--cache-max-age",
+    type=float,
+    default=None,
+    help="Days to keep a parsed file since it was last used.",
+)
+@click.pass_context
+def main(ctx, cache, cache_dir, cache_max_size, cache_max_age):
     """
     A little cli for wos tools.
     """
     logger = logging.getLogger("wostools")
     logger.setLevel(logging.ERROR)
+    parse_cache = ParseCache(
+        cache_dir,
+        max_size=cache_max_size * 2**20 if cache_max_size is not None else None,
+        max_age=cache_max_age * 24 * 60 * 60 if cache_max_age is not None else None,
+    )
+    ctx.obj = {"cache_dir": cache_dir, "parse_cache": parse_cache if cache else None}
+
+
+def _is_stdout(output) -> bool:
+    # Click names the standard output like this
+    return output.name in ("-", "<stdout>")
+
+
+def _jobs(jobs: int) -> int:
+    return jobs or os.cpu_count() or 1
+
+
+def _collection(
+    obj, sources, jobs: int = 1, locate_sources: bool = True
+) -> CachedCollection:
+    return CachedCollection.from_filenames(
+        *[f.name for f in sources],
+        parse_cache=obj["parse_cache"],
+        workers=jobs,
+        locate_sources=locate_sources,
+    )
+
+
+jobs_option = click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=1,
+    help=(
+        "Processes to parse files and encode the output with, 0 for one per "
+        "CPU. The output is the same for any number of them."
+    ),
+)
+
+
+@main.command("clear-cache")
+@click.pass_obj
+def clear_cache(obj):
+    """
+    Remove every parsed file kept in the cache directory.
+    """
+    ParseCache(obj["cache_dir"]).clear()
+    click.echo(f"Cleared {obj['cache_dir']}")
 
 
 @main.command("citation-pairs")
@@ -24,7 +114,33 @@ def main():
     default="-",
     help="File to save json output.",
 )
-def citation_pairs(sources, output):
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["json", "tsv", "binary"]),
+    show_default=True,
+    default="json",
+    help=(
+        "Pairs of labels in json, or integer edges as tsv or binary along "
+        "with a table of node ids and labels."
+    ),
+)
+@click.option(
+    "--nodes",
+    type=click.File("w"),
+    default=None,
+    help="File to save the node table, next to the output by default.",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help="Leave out indentation and spaces from json.",
+)
+@jobs_option
+@click.pass_obj
+def citation_pairs(obj, sources, output, output_format, nodes, compact, jobs):
     """
     Build a collection by using the sources and print the citation pairs in json
     format or dumps them in the `output`.
@@ -32,13 +148,37 @@ def citation_pairs(sources, output):
     if not len(sources) > 0:
         click.secho("You should give at least a file with documents.", fg="red")
         return
+    if output_format != "json" and nodes is None and _is_stdout(output):
+        click.secho("Integer edges need --nodes or an --output file.", fg="red")
+        return
 
-    collection = CachedCollection.from_filenames(*[f.name for f in sources])
-    pairs = [
-        (source.label, target.label) for source, target in collection.citation_pairs()
-    ]
+    jobs = _jobs(jobs)
+    collection = _collection(obj, sources, jobs)
+    if output_format == "json":
+        write_json(
+            (
+                [source.label, target.label]
+                for source, target in collection.citation_pairs()
+            ),
+            output,
+            compact=compact,
+            jobs=jobs,
+        )
+        return
 
-    json.dump(pairs, output, indent=2)
+    graph = collection.citation_graph()
+    with ExitStack() as stack:
+        if nodes is None:
+            stem, _ = os.path.splitext(output.name)
+            nodes = stack.enter_context(
+                open(f"{stem}-nodes.tsv", "w", encoding="utf-8", newline="")
+            )
+        write_nodes(graph.nodes, nodes)
+    if output_format == "tsv":
+        write_edges(graph.citing, output, jobs=jobs)
+    else:
+        output.flush()
+        write_binary_edges(graph.citing, output.buffer, jobs=jobs)
 
 
 @main.command("to-json")
@@ -58,7 +198,27 @@ def citation_pairs(sources, output):
     default=False,
     help="Add extra info to the output",
 )
-def to_json(sources, output, more):
+@click.option(
+    "--compact",
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help="Leave out indentation and spaces.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["json", "jsonl", "csv", "tsv"]),
+    show_default=True,
+    default="json",
+    help=(
+        "A JSON array, one JSON article per line, or delimited tables. Tables "
+        "put authors, keywords and references in side tables next to the output."
+    ),
+)
+@jobs_option
+@click.pass_obj
+def to_json(obj, sources, output, more, compact, output_format, jobs):
     """
     Build a collection by using the sources and print the citation pairs in json
     format or dumps them in the `output`.
@@ -67,9 +227,37 @@ def to_json(sources, output, more):
         click.secho("You should give at least a file with documents.", fg="red")
         return
 
-    collection = CachedCollection.from_filenames(*[f.name for f in sources])
-    json.dump(
-        [article.to_dict(simplified=not more) for article in collection],
+    if output_format in TABLE_DELIMITERS and _is_stdout(output):
+        click.secho(
+            "Tables need an --output file to put side tables next to.", fg="red"
+        )
+        return
+
+    jobs = _jobs(jobs)
+    # Record locations mean nothing once we are done, print their text instead
+    collection = _collection(obj, sources, jobs, locate_sources=not more)
+    if output_format in TABLE_DELIMITERS:
+        with ExitStack() as stack:
+            side_outputs = {
+                field: stack.enter_context(
+                    open(name, "w", encoding=output.encoding, newline="")
+                )
+                for field, name in table_names(output.name).items()
+            }
+            write_tables(
+                collection,
+                output,
+                side_outputs,
+                TABLE_DELIMITERS[output_format],
+                jobs=jobs,
+            )
+        return
+    write = write_jsonl if output_format == "jsonl" else write_json
+    write(
+        collection,
         output,
-        indent=2,
+        compact=compact,
+        # Articles are turned into dicts along with their encoding
+        convert=operator.methodcaller("to_dict", simplified=not more),
+        jobs=jobs,
     )
@@ -0,0 +1,152 @@
+"""
+Persistent cache of parsed files.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, List, Optional, Tuple
+
+from wostools import __version__
+from wostools.article import Article
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the entries changes in a way the version doesn't show
+CACHE_FORMAT = 1
+
+ENTRY_SUFFIX = ".pickle"
+
+# Files are hashed in blocks of this many bytes
+HASH_BLOCK_SIZE = 1 << 20
+
+# (file id used when parsing, articles, isi checkpoints)
+Entry = Tuple[Optional[int], List[Article], List[Tuple[int, int]]]
+
+
+def default_directory() -> str:
+    """Where the cache lives unless told otherwise, following XDG."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "wostools")
+
+
+class ParseCache:
+    """
+    Parsed articles of whole files, stored on disk under a directory.
+
+    Entries are keyed by a hash of the file contents, the wostools version and
+    the options used to parse them, so changed files or a new release never
+    load stale articles. Entries are pickles: only point this to a directory
+    you trust.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Args:
+            directory (str): Where to keep the entries, `default_directory()`
+                if not given.
+            max_size (int): Bytes to keep at most, least recently used entries
+                are evicted first.
+            max_age (float): Seconds an entry is kept since it was last used.
+        """
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def key(self, filename: str, *options: Any) -> str:
+        """Hashes the contents of a file along with the parsing options."""
+        digest = hashlib.sha256(f"{CACHE_FORMAT}:{__version__}:{options!r}".encode())
+        with open(filename, "rb") as file:
+            for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[Entry]:
+        """The entry stored under `key`, if any."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning(f"Dropping unreadable cache entry {path}")
+            self._remove(path)
+            return None
+        # Keep track of the last use for eviction
+        os.utime(path)
+        return entry
+
+    def set(self, key: str, entry: Entry):
+        """Stores an entry, atomically, and evicts old ones if needed."""
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            self._remove(temporary)
+            raise
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Removes the entries that are too old or don't fit in `max_size`."""
+        if self.max_size is None and self.max_age is None:
+            return
+        entries = sorted(self._entries(), reverse=True)
+        total = 0
+        now = time.time()
+        for used, size, path in entries:
+            total += size
+            too_old = self.max_age is not None and now - used > self.max_age
+            too_big = self.max_size is not None and total > self.max_size
+            if too_old or too_big:
+                self._remove(path)
+                total -= size
+
+    def clear(self):
+        """Removes every entry."""
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def size(self) -> int:
+        """Bytes used by the entries."""
+        return sum(size for _, size, _ in self._entries())
@@ -35,3 +35,22 @@ class MissingLabelFields(WosToolsError, ValueError):
     def __init__(self, article, message: str = None):
         self.article = article
         super().__init__(message or "Missing required fields for label")
+
+
+class InvalidSnapshot(WosToolsError, ValueError):
+    """
+    Raised when a file can't be loaded as a collection snapshot.
+    """
+
+    def __init__(self, path: str, reason: str):
+        super().__init__(f"{path} is not a valid snapshot, {reason}")
+
+
+class MissingSource(WosToolsError, LookupError):
+    """
+    Raised when the file an article was read from is gone or has changed.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        super().__init__(f"The file of {source} can't be read anymore")
@@ -5,7 +5,7 @@ The wos fields definitions.
 import collections
 import functools
 import logging
-from typing import Any, Dict, List, Mapping
+from typing import Any, Dict, Iterator, List, Mapping, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -185,23 +185,124 @@ FIELDS = {
 }
 
 
+HEADERS = {"FN", "VR", "ER"}
+
+ALIASES: Dict[str, List[str]] = {
+    alias: [other.key for other in FIELDS.values() if alias in other.aliases]
+    for field in FIELDS.values()
+    for alias in field.aliases
+}
+
+
+def _parse_value(key: str, value: List) -> Any:
+    if key in FIELDS:
+        return FIELDS[key].parse(value)
+    logger.info(f"Found an unknown field with key {key} and value {value}")
+    return ident(value)
+
+
 def parse(key: str, value: List) -> Dict:
-    if key in {"FN", "VR", "ER"}:
+    if key in HEADERS:
         # This disregards headers
         return {}
-    if key in FIELDS:
-        field = FIELDS[key]
-        parsed = field.parse(value)
-        return {k: parsed for k in [key, *field.aliases]}
-    logger.info(f"Found an unknown field with key {key} and value {value}")
-    return {key: ident(value)}
+    return {key: _parse_value(key, value)}
+
+
+class Fields(Mapping[str, Any]):
+    """Read only mapping of field values that also resolves the field aliases.
+
+    Each value is stored once under its field tag, looking up an alias finds
+    the tag it belongs to. When several tags share an alias the last one wins,
+    as if the values had been stored under every alias in order.
+    """
+
+    # Every article has one, citations included
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def _value(self, tag: str) -> Any:
+        return self._data[tag]
+
+    def _tag(self, key: str) -> str:
+        if key in self._data:
+            return key
+        tags = [tag for tag in ALIASES.get(key, ()) if tag in self._data]
+        if not tags:
+            raise KeyError(key)
+        if len(tags) > 1:
+            order = list(self._data)
+            tags.sort(key=order.index)
+        return tags[-1]
+
+    def __getitem__(self, key: str) -> Any:
+        return self._value(self._tag(key))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data or any(
+            tag in self._data for tag in ALIASES.get(key, ())  # type: ignore
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for tag in self._data:
+            aliases = FIELDS[tag].aliases if tag in FIELDS else []
+            for key in [tag, *aliases]:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return bool(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class LazyFields(Fields):
+    """Field values that are parsed the first time they are looked up.
+
+    Keeps the raw field tag to lines data and runs the field parser the first
+    time a tag or any of its aliases is looked up, memoizing the result.
+    """
+
+    __slots__ = ("_parsed",)
+
+    def __init__(self, raw_dict: Dict[str, List[str]]):
+        for header in HEADERS:
+            raw_dict.pop(header, None)
+        raw_dict.setdefault("CR", [])
+        super().__init__(raw_dict)
+        # Most mappings never parse a value, like the ones of citations
+        self._parsed: Optional[Dict[str, Any]] = None
+
+    def _value(self, tag: str) -> Any:
+        if self._parsed is None:
+            self._parsed = {}
+        if tag not in self._parsed:
+            self._parsed[tag] = _parse_value(tag, self._data[tag])
+        return self._parsed[tag]
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Parses a field without memoizing it, for values kept somewhere else."""
+        try:
+            tag = self._tag(key)
+        except KeyError:
+            return default
+        if self._parsed and tag in self._parsed:
+            return self._parsed[tag]
+        return _parse_value(tag, self._data[tag])
 
 
 def parse_all(raw_dict: Dict[str, List[str]]) -> Mapping[str, Any]:
     """Preprocesses a dictionary, with information about WoS field tags and its
         value according to an article, with some parser functions that depends on
         the field tag. If there is no a CR field, it adds one to the output with
-        an empty list as value. Finally, the field aliases are also appended as
+        an empty list as value. Finally, the field aliases can also be used as
         keys.
 
         http://wos-resources.roblib.upei.ca/WOK46/help/WOK/hft_wos.html
@@ -211,13 +312,42 @@ def parse_all(raw_dict: Dict[str, List[str]]) -> Mapping[str, Any]:
             values are those corresponding to that field tag.
 
     Returns:
-        dict: A dict with the same structure of the raw_input but the values are
-            preprocessed according to some functions that depend on the field
-            tag. Those functions were designed based on the field tad value
-            structure.
+        Fields: A read only mapping with the same structure of the raw_input
+            but the values are preprocessed according to some functions that
+            depend on the field tag. Those functions were designed based on the
+            field tad value structure.
     """
     processed_data = {}
     raw_dict.setdefault("CR", [])
     for key, seq in raw_dict.items():
         processed_data.update(parse(key, seq))
-    return processed_data
+    return Fields(processed_data)
+
+
+def merge_fields(*mappings: Mapping[str, Any]) -> Mapping:
+    """Merges field mappings, values in later mappings take precedence.
+
+    Lazy mappings are merged without parsing any pending field, all of them in
+    a single pass no matter how many there are.
+    """
+    if all(isinstance(mapping, LazyFields) for mapping in mappings):
+        data: Dict[str, Any] = {}
+        parsed: Dict[str, Any] = {}
+        for mapping in mappings:
+            for key in mapping._data:
+                # A parsed value is only good while its raw value wins
+                parsed.pop(key, None)
+            data.update(mapping._data)
+            parsed.update(mapping._parsed or {})
+        merged = LazyFields(data)
+        merged._parsed = parsed or None
+        return merged
+    if all(type(mapping) is Fields for mapping in mappings):
+        data = {}
+        for mapping in mappings:
+            data.update(mapping._data)
+        return Fields(data)
+    merged_dict: Dict[str, Any] = {}
+    for mapping in mappings:
+        merged_dict.update(mapping)
+    return merged_dict
@@ -0,0 +1,181 @@
+"""
+Filters checked on raw records, before they are parsed.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from wostools.fields import ALIASES, FIELDS
+
+YearRange = Tuple[Optional[int], Optional[int]]
+
+# Field tags in ISI and RIS records alike
+TAG_PATTERN = re.compile(r"[A-Z][A-Z0-9]")
+
+# The RIS tags of ISI fields, as the scopus parser reads them
+RIS_TAGS = {
+    "AB": "AB",
+    "AR": "C7",
+    "AU": "AU",
+    "BP": "SP",
+    "CR": "N1:References",
+    "DE": "KW",
+    "DI": "DO",
+    "DT": "M3",
+    "EP": "EP",
+    "ID": "KW",
+    "IS": "IS",
+    "J9": "J2",
+    "LA": "LA",
+    "PY": "PY",
+    "SN": "SN",
+    "SO": "T2",
+    "TI": "TI",
+    "VL": "VL",
+}
+
+
+def _isi_value(raw: str, tag: str) -> Optional[str]:
+    """The first line of a field in a raw ISI record, without parsing it."""
+    if raw.startswith(f"{tag} "):
+        start = len(tag) + 1
+    else:
+        start = raw.find(f"\n{tag} ")
+        if start < 0:
+            return None
+        start += len(tag) + 2
+    end = raw.find("\n", start)
+    return raw[start:] if end < 0 else raw[start:end]
+
+
+def _has_isi_tag(raw: str, tag: str) -> bool:
+    return raw.startswith(f"{tag} ") or f"\n{tag} " in raw
+
+
+def _tags(key: str) -> List[str]:
+    if key in FIELDS:
+        return [key]
+    return ALIASES.get(key, [key])
+
+
+def _ris_tags(key: str) -> List[str]:
+    """The RIS tags of a field, tags ISI doesn't have are RIS tags already."""
+    if key not in FIELDS and key not in ALIASES:
+        return [key]
+    tags = [RIS_TAGS[tag] for tag in _tags(key) if tag in RIS_TAGS]
+    if not tags:
+        raise ValueError(f"{key!r} has no equivalent in RIS records")
+    return tags
+
+
+def _folded(values: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    if values is None:
+        return None
+    return frozenset(value.strip().casefold() for value in values)
+
+
+class RecordFilter:
+    """
+    Which records make it into a collection.
+
+    Records are checked on their raw tag lines, so the ones left out are never
+    parsed and their references never become articles. Every condition given
+    has to hold.
+    """
+
+    def __init__(
+        self,
+        years: Optional[YearRange] = None,
+        document_types: Optional[Iterable[str]] = None,
+        languages: Optional[Iterable[str]] = None,
+        fields: Iterable[str] = (),
+    ):
+        """
+        Args:
+            years (tuple): Inclusive `(start, end)` range of publication
+                years, either end can be `None`.
+            document_types (list): Document types to keep, like `"Article"`,
+                records with several types are kept if any of them matches.
+            languages (list): Languages to keep, like `"English"`.
+            fields (list): Fields every record must have, ISI tags or their
+                aliases like `"DOI"` or `"authors"`. RIS records are checked
+                on the matching RIS tags, other tags are taken as RIS tags.
+
+        Raises:
+            ValueError: When a field is neither a tag nor an alias, or when
+                checking a RIS record for an ISI field RIS doesn't have.
+        """
+        self.years = years
+        self.document_types = _folded(document_types)
+        self.languages = _folded(languages)
+        self.fields = tuple(fields)
+        for key in self.fields:
+            if key not in ALIASES and not TAG_PATTERN.fullmatch(key):
+                # Would look for a tag no record has and leave out every one
+                raise ValueError(f"{key!r} is neither a field tag nor an alias")
+        # Found on the first RIS record, ISI fields may have no RIS tag
+        self._ris_fields: Optional[List[List[str]]] = None
+
+    def __repr__(self) -> str:
+        # Stable across runs, it takes part in the parse cache keys
+        def ordered(values):
+            return sorted(values) if values is not None else None
+
+        return (
+            f"RecordFilter(years={self.years!r}, "
+            f"document_types={ordered(self.document_types)!r}, "
+            f"languages={ordered(self.languages)!r}, fields={self.fields!r})"
+        )
+
+    def _accepts(
+        self,
+        year: Optional[str],
+        document_type: Optional[str],
+        language: Optional[str],
+    ) -> bool:
+        if self.years is not None:
+            try:
+                value = int((year or "").strip())
+            except ValueError:
+                return False
+            start, end = self.years
+            if (start is not None and value < start) or (
+                end is not None and value > end
+            ):
+                return False
+        for accepted, raw in (
+            (self.document_types, document_type),
+            (self.languages, language),
+        ):
+            if accepted is None:
+                continue
+            if not raw or not any(
+                value.strip().casefold() in accepted for value in raw.split(";")
+            ):
+                return False
+        return True
+
+    def accepts_isi(self, raw: str) -> bool:
+        """Checks a raw ISI record, as in the text between blank lines."""
+        if not all(
+            any(_has_isi_tag(raw, tag) for tag in _tags(key)) for key in self.fields
+        ):
+            return False
+        return self._accepts(
+            _isi_value(raw, "PY") if self.years is not None else None,
+            _isi_value(raw, "DT") if self.document_types is not None else None,
+            _isi_value(raw, "LA") if self.languages is not None else None,
+        )
+
+    def accepts_ris(self, data: Dict[str, List[str]]) -> bool:
+        """Checks the tags of a RIS record, document types are in `M3`."""
+        if self._ris_fields is None:
+            self._ris_fields = [_ris_tags(key) for key in self.fields]
+        if not all(any(tag in data for tag in tags) for tags in self._ris_fields):
+            return False
+
+        def first(tag: str) -> Optional[str]:
+            values = data.get(tag)
+            return values[0] if values else None
+
+        return self._accepts(first("PY"), first("M3"), first("LA"))
@@ -0,0 +1,113 @@
+"""
+Graphs with integer nodes in compressed sparse row form.
+"""
+
+from array import array
+from typing import Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+
+def _zeros(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+class CSR(NamedTuple):
+    """
+    Edges in compressed sparse row form.
+
+    The neighbors of node `i` are `indices[offsets[i]:offsets[i + 1]]`, with
+    their weights at the same positions in `weights`. All of them are
+    `array("q")`, so `numpy.frombuffer(csr.indices, dtype="int64")` and
+    friends can use them without copies.
+    """
+
+    offsets: array
+    indices: array
+    weights: Optional[array] = None
+
+    @classmethod
+    def from_counts(cls, size: int, counts: Mapping[Tuple[int, int], int]) -> "CSR":
+        """Builds weighted rows out of the number of times each edge shows up."""
+        offsets = _zeros(size + 1)
+        indices = array("q")
+        weights = array("q")
+        for (node, neighbor), count in sorted(counts.items()):
+            offsets[node + 1] += 1
+            indices.append(neighbor)
+            weights.append(count)
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+        return cls(offsets, indices, weights)
+
+    @property
+    def size(self) -> int:
+        """Number of nodes."""
+        return len(self.offsets) - 1
+
+    def neighbors(self, node: int) -> array:
+        return self.indices[self.offsets[node] : self.offsets[node + 1]]
+
+    def edges(self) -> Iterator[Tuple[int, int]]:
+        """Iterates over `(node, neighbor)` pairs, in order."""
+        for node in range(self.size):
+            for index in range(self.offsets[node], self.offsets[node + 1]):
+                yield node, self.indices[index]
+
+    def transpose(self) -> "CSR":
+        """The same edges the other way around, built with a counting sort."""
+        size = self.size
+        offsets = _zeros(size + 1)
+        for index in self.indices:
+            offsets[index + 1] += 1
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+        positions = offsets[:-1]
+        indices = _zeros(len(self.indices))
+        weights = _zeros(len(self.indices)) if self.weights is not None else None
+        for node in range(size):
+            for edge in range(self.offsets[node], self.offsets[node + 1]):
+                index = self.indices[edge]
+                position = positions[index]
+                indices[position] = node
+                if weights is not None:
+                    weights[position] = self.weights[edge]  # type: ignore
+                positions[index] += 1
+        return CSR(offsets, indices, weights)
+
+
+class CitationGraph(NamedTuple):
+    """
+    Citations between the articles of a collection.
+
+    Articles are numbered by their position in `nodes`, which holds their
+    labels. `citing` has the edges from each article to the ones it cites and
+    `cited_by` the same edges reversed.
+    """
+
+    nodes: List[str]
+    citing: CSR
+    cited_by: CSR
+
+
+class CoauthorGraph(NamedTuple):
+    """
+    Coauthorships between the authors of a collection.
+
+    Authors are numbered by their position in `nodes`. `edges` is symmetric,
+    every pair of coauthors shows up both ways, weighted by the number of
+    articles they wrote together.
+    """
+
+    nodes: List[str]
+    edges: CSR
+
+    def pairs(self) -> Iterator[Tuple[str, str, int]]:
+        """Iterates over each pair of coauthors once, along with its weight."""
+        offsets, indices, weights = self.edges
+        for node in range(self.edges.size):
+            for edge in range(offsets[node], offsets[node + 1]):
+                if node < indices[edge]:
+                    yield (
+                        self.nodes[node],
+                        self.nodes[indices[edge]],
+                        weights[edge],  # type: ignore
+                    )
@@ -0,0 +1,134 @@
+"""
+Inverted indexes over the articles of a collection.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from wostools.article import Article
+
+DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "http://dx.doi.org/", "doi:")
+
+# A single year or an inclusive range of years, either end can be open
+Years = Union[int, Tuple[Optional[int], Optional[int]]]
+
+
+def normalize_doi(doi: str) -> str:
+    """Lower cases a DOI and strips the usual URL and scheme prefixes."""
+    doi = doi.strip().lower()
+    for prefix in DOI_PREFIXES:
+        if doi.startswith(prefix):
+            return doi[len(prefix) :]
+    return doi
+
+
+def normalize_name(name: str) -> str:
+    """Author and journal names are looked up regardless of case."""
+    return " ".join(name.split()).casefold()
+
+
+class ArticleIndex:
+    """
+    Labels of articles by author, year, journal and DOI.
+
+    Lookups intersect the smallest matching set with the rest of the filters,
+    so they cost about as much as the most selective filter.
+    """
+
+    def __init__(self, articles: Mapping[str, Article]):
+        """
+        Args:
+            articles (Mapping): The indexed articles by label, used to check
+                year ranges on the few articles other filters leave.
+        """
+        self._articles = articles
+        self._authors: Dict[str, Set[str]] = {}
+        self._years: Dict[int, Set[str]] = {}
+        self._journals: Dict[str, Set[str]] = {}
+        self._dois: Dict[str, Set[str]] = {}
+
+    def _keys(self, article: Article) -> Iterable[Tuple[Dict, object]]:
+        for author in set(article.authors):
+            yield self._authors, normalize_name(author)
+        if article.year is not None:
+            yield self._years, article.year
+        if article.journal:
+            yield self._journals, normalize_name(article.journal)
+        if article.doi:
+            yield self._dois, normalize_doi(article.doi)
+
+    def add(self, label: str, article: Article):
+        for index, key in self._keys(article):
+            index.setdefault(key, set()).add(label)
+
+    def remove(self, label: str, article: Article):
+        for index, key in self._keys(article):
+            labels = index.get(key)
+            if labels is None:
+                continue
+            labels.discard(label)
+            if not labels:
+                del index[key]
+
+    def _year_labels(self, start: Optional[int], end: Optional[int]) -> Set[str]:
+        labels: Set[str] = set()
+        for year, matches in self._years.items():
+            if _within(year, start, end):
+                labels |= matches
+        return labels
+
+    def query(
+        self,
+        author: Optional[str] = None,
+        year: Optional[Years] = None,
+        journal: Optional[str] = None,
+        doi: Optional[str] = None,
+    ) -> Set[str]:
+        """Labels of the articles matching every filter given.
+
+        Args:
+            author (str): One of the authors.
+            year (int or tuple): The year, or an inclusive `(start, end)`
+                range where either end can be `None`.
+            journal (str): The journal, as in `Article.journal`.
+            doi (str): The DOI, with or without a `https://doi.org/` prefix.
+
+        Returns:
+            set: Labels of the matching articles, none if no filter is given.
+        """
+        candidates: List[Set[str]] = []
+        if author is not None:
+            candidates.append(self._authors.get(normalize_name(author), set()))
+        if journal is not None:
+            candidates.append(self._journals.get(normalize_name(journal), set()))
+        if doi is not None:
+            candidates.append(self._dois.get(normalize_doi(doi), set()))
+        year_range = None
+        if isinstance(year, int):
+            candidates.append(self._years.get(year, set()))
+        elif year is not None:
+            year_range = year
+        if year_range is not None and not candidates:
+            candidates.append(self._year_labels(*year_range))
+            year_range = None
+        if not candidates:
+            return set()
+        candidates.sort(key=len)
+        smallest, *others = candidates
+        labels = {
+            label for label in smallest if all(label in other for other in others)
+        }
+        if year_range is not None:
+            # Ranges may cover most of the collection, check the few left instead
+            start, end = year_range
+            labels = {
+                label
+                for label in labels
+                if _within(getattr(self._articles.get(label), "year", None), start, end)
+            }
+        return labels
+
+
+def _within(value: Optional[int], start: Optional[int], end: Optional[int]) -> bool:
+    if value is None:
+        return False
+    return (start is None or value >= start) and (end is None or value <= end)
@@ -0,0 +1,670 @@
+"""
+Binary snapshots of whole collections, loaded lazily from memory maps.
+
+A snapshot is a header followed by sections of little endian signed 64 bit
+integers, or UTF-8 text for the string table data. The header is
+`SNAPSHOT_MAGIC`, the format version and number of sections as unsigned 32 bit
+integers, and the byte offset and length of each section in `SECTIONS` as
+unsigned 64 bit integers.
+
+Every string is stored once in the string table, and everywhere else strings
+are ids into it, `NONE` for missing values. Articles are fixed width records
+with the columns in `RECORD_FIELDS`, where lists are ranges of string ids in
+the `lists` section. Raw fields, as kept by `LazyFields`, are also in `lists`
+as the number of tags followed by each tag, its number of lines and the lines.
+Parsed extra fields and sources are a range of JSON text in the `extra`
+section. The authors of the newest parsed record merged into each article are
+a range in `lists` too, `NONE` for articles only known from citations. The
+labels the collection knows about are numbered by their union-find ids, with
+the label each one resolves to in `refs`. Both articles and labels have their
+positions sorted by label, so they are found with a binary search instead of
+building dicts on load. The files source locations point to are described in
+JSON in `files`.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from wostools.article import Article
+from wostools.exceptions import InvalidSnapshot
+from wostools.fields import Fields, LazyFields
+from wostools.sources import SourceLocation
+from wostools.sources.isi import Checkpoints
+from wostools.sources.mapped import MappedFile
+
+SNAPSHOT_MAGIC = b"WOSSNAP\x00"
+
+# Bump whenever the layout changes, older snapshots are refused
+SNAPSHOT_VERSION = 2
+
+# Missing strings and years
+NONE = -1
+
+SECTIONS = (
+    "strings",
+    "string_data",
+    "records",
+    "record_order",
+    "lists",
+    "extra",
+    "names",
+    "name_order",
+    "refs",
+    "parents",
+    "sizes",
+    "next",
+    "files",
+)
+
+RECORD_FIELDS = (
+    "label",
+    "title",
+    "year",
+    "journal",
+    "volume",
+    "issue",
+    "page",
+    "doi",
+    "authors",
+    "authors_count",
+    "keywords",
+    "keywords_count",
+    "references",
+    "references_count",
+    "record_authors",
+    "record_authors_count",
+    "fields",
+    "extra",
+    "extra_length",
+)
+RECORD_WIDTH = len(RECORD_FIELDS)
+
+# How the extra fields of an article were kept
+EXTRA_DICT = 0
+EXTRA_FIELDS = 1
+EXTRA_LAZY = 2
+
+_HEADER = struct.Struct("<II")
+_SECTION = struct.Struct("<QQ")
+HEADER_SIZE = len(SNAPSHOT_MAGIC) + _HEADER.size + _SECTION.size * len(SECTIONS)
+
+_MISSING = object()
+
+
+def _encode_extra(article: Article) -> bytes:
+    extra = article.extra
+    if (not extra or isinstance(extra, LazyFields)) and not article.sources:
+        return b""
+    if isinstance(extra, LazyFields):
+        # The fields themselves go in the lists section
+        kind, data = EXTRA_LAZY, None
+    elif type(extra) is Fields:
+        kind, data = EXTRA_FIELDS, extra._data
+    else:
+        kind, data = EXTRA_DICT, dict(extra)
+    sources = sorted(
+        (
+            (list(source) if isinstance(source, SourceLocation) else source)
+            for source in article.sources
+        ),
+        key=lambda source: (isinstance(source, list), source),
+    )
+    return json.dumps([kind, data, sources], separators=(",", ":")).encode()
+
+
+def _decode_extra(text: bytes) -> Tuple[Optional[Mapping], List]:
+    if not text:
+        return None, []
+    kind, data, sources = json.loads(text)
+    extra: Optional[Mapping] = data
+    if kind == EXTRA_FIELDS:
+        extra = Fields(data)
+    return extra, [
+        SourceLocation(*source) if isinstance(source, list) else source
+        for source in sources
+    ]
+
+
+def describe_file(file: Any, checkpoints: Checkpoints) -> Optional[Dict[str, Any]]:
+    """What it takes to open a file again and check it didn't change.
+
+    Returns:
+        dict: The description, `None` for files without a name, like
+            `io.StringIO`.
+    """
+    name = getattr(file, "name", None)
+    if not isinstance(name, str) or not os.path.isfile(name):
+        return None
+    stat = os.stat(name)
+    return {
+        "name": os.path.abspath(name),
+        "encoding": file.encoding,
+        "mapped": isinstance(file, MappedFile),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "checkpoints": checkpoints,
+    }
+
+
+def reopen_file(
+    description: Optional[Dict[str, Any]],
+) -> Optional[Tuple[Any, Checkpoints]]:
+    """Opens a described file again, along with its checkpoints.
+
+    Returns:
+        tuple: The file and its checkpoints, `None` when the file is gone or
+            changed since it was described.
+    """
+    if description is None:
+        return None
+    name = description["name"]
+    try:
+        stat = os.stat(name)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (description["size"], description["mtime"]):
+        return None
+    checkpoints = [tuple(checkpoint) for checkpoint in description["checkpoints"]]
+    if description["mapped"]:
+        return MappedFile(name, description["encoding"]), checkpoints  # type: ignore
+    return open(name, encoding=description["encoding"]), checkpoints  # type: ignore
+
+
+class _StringTableBuilder:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        id_ = self.ids.get(value)
+        if id_ is None:
+            id_ = self.ids[value] = len(self.ids)
+            self.data += value.encode()
+            self.offsets.append(len(self.data))
+        return id_
+
+
+def _section_bytes(section: Union[array, bytes, bytearray]) -> bytes:
+    if isinstance(section, array):
+        if sys.byteorder == "big":
+            section = array(section.typecode, section)
+            section.byteswap()
+        return section.tobytes()
+    return bytes(section)
+
+
+def write_snapshot(
+    path: str,
+    articles: Iterable[Tuple[str, Article]],
+    record_authors: Mapping[str, Sequence[str]],
+    names: Sequence[str],
+    refs: Mapping[str, str],
+    parents: array,
+    sizes: array,
+    next_: array,
+    files: Sequence[Optional[Dict[str, Any]]] = (),
+):
+    """Writes a snapshot atomically, replacing `path` once it's complete.
+
+    Args:
+        path (str): Where to write the snapshot.
+        articles (iterable): Articles by label, in the order they iterate in.
+        record_authors (Mapping): Authors of the records merged into each
+            article, by label.
+        names (Sequence): Labels by union-find id.
+        refs (Mapping): The label each label resolves to.
+        parents (array): Union-find parents by id.
+        sizes (array): Union-find set sizes by id.
+        next_ (array): Next id in the circular list of each set.
+        files (Sequence): Descriptions of the files source locations point
+            to, by file id, see `describe_file`.
+    """
+    strings = _StringTableBuilder()
+    records = array("q")
+    lists = array("q")
+    extra = bytearray()
+    labels: List[str] = []
+    for label, article in articles:
+        labels.append(label)
+        records.extend(
+            (
+                strings.add(label),
+                strings.add(article.title),
+                NONE if article.year is None else article.year,
+                strings.add(article.journal),
+                strings.add(article.volume),
+                strings.add(article.issue),
+                strings.add(article.page),
+                strings.add(article.doi),
+            )
+        )
+        for values in (article.authors, article.keywords, article.references):
+            records.extend((len(lists), len(values)))
+            lists.extend(strings.add(value) for value in values)
+        authors = record_authors.get(label)
+        if authors is None:
+            records.extend((NONE, 0))
+        else:
+            records.extend((len(lists), len(authors)))
+            lists.extend(strings.add(author) for author in authors)
+        if isinstance(article.extra, LazyFields):
+            records.append(len(lists))
+            lists.append(len(article.extra._data))
+            for tag, lines in article.extra._data.items():
+                lists.extend((strings.add(tag), len(lines)))
+                lists.extend(strings.add(line) for line in lines)
+        else:
+            records.append(NONE)
+        text = _encode_extra(article)
+        records.extend((len(extra), len(text)))
+        extra += text
+
+    name_ids = array("q", (strings.add(names[id_]) for id_ in range(len(names))))
+    refs_ids = array(
+        "q", (strings.add(refs.get(names[id_])) for id_ in range(len(names)))
+    )
+    sections = {
+        "strings": strings.offsets,
+        "string_data": strings.data,
+        "records": records,
+        "record_order": array("q", sorted(range(len(labels)), key=labels.__getitem__)),
+        "lists": lists,
+        "extra": extra,
+        "names": name_ids,
+        "name_order": array("q", sorted(range(len(names)), key=names.__getitem__)),
+        "refs": refs_ids,
+        "parents": parents,
+        "sizes": sizes,
+        "next": next_,
+        "files": json.dumps(list(files)).encode(),
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            offset = HEADER_SIZE
+            header = [SNAPSHOT_MAGIC, _HEADER.pack(SNAPSHOT_VERSION, len(SECTIONS))]
+            contents = []
+            for name in SECTIONS:
+                content = _section_bytes(sections[name])
+                # Sections start at multiples of 8, so they can be cast in place
+                offset += -offset % 8
+                header.append(_SECTION.pack(offset, len(content)))
+                contents.append((offset, content))
+                offset += len(content)
+            file.write(b"".join(header))
+            for offset, content in contents:
+                file.seek(offset)
+                file.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+class Snapshot:
+    """
+    A snapshot mapped in memory, articles are only built when asked for.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise InvalidSnapshot(path, "the file is empty")
+        data = memoryview(self._mmap)
+        start = len(SNAPSHOT_MAGIC)
+        if len(data) < HEADER_SIZE or data[:start] != SNAPSHOT_MAGIC:
+            raise InvalidSnapshot(path, "it doesn't start with the snapshot magic")
+        version, count = _HEADER.unpack_from(data, start)
+        if version != SNAPSHOT_VERSION or count != len(SECTIONS):
+            raise InvalidSnapshot(
+                path, f"version {version} isn't supported, only {SNAPSHOT_VERSION}"
+            )
+        start += _HEADER.size
+        self._sections: Dict[str, memoryview] = {}
+        for name in SECTIONS:
+            offset, length = _SECTION.unpack_from(data, start)
+            start += _SECTION.size
+            if offset + length > len(data):
+                raise InvalidSnapshot(path, f"section {name} is truncated")
+            self._sections[name] = data[offset : offset + length]
+
+        self._offsets = self.integers("strings")
+        self._data = self._sections["string_data"]
+        self._records = self.integers("records")
+        self._labels = self._records[::RECORD_WIDTH]
+        self._record_order = self.integers("record_order")
+        self._lists = self.integers("lists")
+        self._extra = self._sections["extra"]
+        self.names = self.integers("names")
+        self._name_order = self.integers("name_order")
+        self.refs = self.integers("refs")
+        self.files: List[Optional[Dict[str, Any]]] = json.loads(
+            self._sections["files"].tobytes() or b"[]"
+        )
+
+    def integers(self, name: str) -> Sequence[int]:
+        """A section of integers, cast in place on little endian machines."""
+        if sys.byteorder == "little":
+            return self._sections[name].cast("q")
+        return self.copy(name)
+
+    def copy(self, name: str) -> array:
+        """A copy of a section of integers that can be changed."""
+        values = array("q")
+        values.frombytes(self._sections[name])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    @property
+    def size(self) -> int:
+        """Number of articles."""
+        return len(self._records) // RECORD_WIDTH
+
+    def _raw(self, id_: int) -> bytes:
+        return self._data[self._offsets[id_] : self._offsets[id_ + 1]].tobytes()
+
+    def string(self, id_: int) -> Optional[str]:
+        if id_ == NONE:
+            return None
+        return str(self._data[self._offsets[id_] : self._offsets[id_ + 1]], "utf-8")
+
+    def _strings(self, start: int, count: int) -> List[str]:
+        return [self.string(id_) for id_ in self._lists[start : start + count]]
+
+    def _fields(self, start: int) -> Dict[str, List[str]]:
+        lists = self._lists
+        fields = {}
+        position = start + 1
+        for _ in range(lists[start]):
+            tag, count = lists[position], lists[position + 1]
+            fields[self.string(tag)] = self._strings(position + 2, count)
+            position += 2 + count
+        return fields
+
+    def _search(self, order: Sequence[int], labels: Sequence[int], label: str) -> int:
+        # UTF-8 bytes sort like the code points of the strings they encode
+        key = label.encode()
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._raw(labels[order[middle]]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self._raw(labels[order[low]]) == key:
+            return order[low]
+        return NONE
+
+    def record_label(self, index: int) -> str:
+        return self.string(self._labels[index])
+
+    def find_record(self, label: str) -> int:
+        """Position of the article with a label, `NONE` if there is none."""
+        return self._search(self._record_order, self._labels, label)
+
+    def find_name(self, label: str) -> int:
+        """Union-find id of a label, `NONE` if there is none."""
+        return self._search(self._name_order, self.names, label)
+
+    def record_authors(self, index: int) -> Optional[Tuple[str, ...]]:
+        """Authors of the records merged into the article at a position."""
+        column = index * RECORD_WIDTH + RECORD_FIELDS.index("record_authors")
+        start, count = self._records[column], self._records[column + 1]
+        if start == NONE:
+            return None
+        return tuple(self._strings(start, count))
+
+    def article(self, index: int) -> Article:
+        """Builds the article at a position."""
+        (
+            _,
+            title,
+            year,
+            journal,
+            volume,
+            issue,
+            page,
+            doi,
+            authors,
+            authors_count,
+            keywords,
+            keywords_count,
+            references,
+            references_count,
+            _,
+            _,
+            fields,
+            extra_start,
+            extra_length,
+        ) = self._records[index * RECORD_WIDTH : (index + 1) * RECORD_WIDTH]
+        extra, sources = _decode_extra(
+            self._extra[extra_start : extra_start + extra_length].tobytes()
+        )
+        if fields != NONE:
+            extra = LazyFields(self._fields(fields))
+        return Article(
+            title=self.string(title),
+            authors=self._strings(authors, authors_count),
+            year=None if year == NONE else year,
+            journal=self.string(journal),
+            volume=self.string(volume),
+            issue=self.string(issue),
+            page=self.string(page),
+            doi=self.string(doi),
+            references=self._strings(references, references_count),
+            keywords=self._strings(keywords, keywords_count),
+            sources=set(sources),
+            extra=extra,
+        )
+
+
+class SnapshotMapping(MutableMapping[str, Any], ABC):
+    """
+    The items of a snapshot, with the changes made since it was loaded kept
+    in memory on top of it.
+
+    Keys keep their place when their value changes and go to the end when
+    they are added, like in a dict.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+        self._overrides: Dict[str, Any] = {}
+        self._added: Dict[str, Any] = {}
+        self._deleted: Set[str] = set()
+
+    @abstractmethod
+    def _position(self, key: str) -> int:
+        """Position of a key in the snapshot, `NONE` if it isn't there."""
+
+    @abstractmethod
+    def _positions(self) -> Iterator[Tuple[str, int]]:
+        """Keys in the snapshot along with their positions, in order."""
+
+    @abstractmethod
+    def _value(self, position: int) -> Any:
+        """The value at a position of the snapshot."""
+
+    def _count(self) -> int:
+        return sum(1 for _ in self._positions())
+
+    def _stored(self, key: object) -> bool:
+        return (
+            isinstance(key, str)
+            and key not in self._deleted
+            and self._position(key) != NONE
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        for changes in (self._added, self._overrides):
+            value = changes.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        position = NONE if key in self._deleted else self._position(key)
+        if position == NONE:
+            raise KeyError(key)
+        return self._value(position)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._added and self._stored(key):
+            self._overrides[key] = value
+        else:
+            self._added[key] = value
+
+    def __delitem__(self, key: str):
+        if self._added.pop(key, _MISSING) is not _MISSING:
+            return
+        if not self._stored(key):
+            raise KeyError(key)
+        self._overrides.pop(key, None)
+        self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._added or key in self._overrides or self._stored(key)
+
+    def items(self):  # type: ignore
+        for key, position in self._positions():
+            if key in self._deleted:
+                continue
+            value = self._overrides.get(key, _MISSING)
+            yield key, self._value(position) if value is _MISSING else value
+        yield from self._added.items()
+
+    def values(self):  # type: ignore
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._positions():
+            if key not in self._deleted:
+                yield key
+        yield from self._added
+
+    def __len__(self) -> int:
+        return self._count() - len(self._deleted) + len(self._added)
+
+
+class SnapshotArticles(SnapshotMapping):
+    """Articles by label, built from the snapshot each time they are read."""
+
+    def _position(self, key: str) -> int:
+        return self._snapshot.find_record(key)
+
+    def _positions(self) -> Iterator[Tuple[str, int]]:
+        for index in range(self._snapshot.size):
+            yield self._snapshot.record_label(index), index
+
+    def _value(self, position: int) -> Article:
+        return self._snapshot.article(position)
+
+    def _count(self) -> int:
+        return self._snapshot.size
+
+
+class SnapshotRecordAuthors(SnapshotArticles):
+    """Authors of the parsed records in each article, by label."""
+
+    def _position(self, key: str) -> int:
+        index = self._snapshot.find_record(key)
+        if index == NONE or self._snapshot.record_authors(index) is None:
+            return NONE
+        return index
+
+    def _positions(self) -> Iterator[Tuple[str, int]]:
+        for label, index in super()._positions():
+            if self._snapshot.record_authors(index) is not None:
+                yield label, index
+
+    def _value(self, position: int) -> Tuple[str, ...]:
+        return self._snapshot.record_authors(position)  # type: ignore
+
+    def _count(self) -> int:
+        return sum(1 for _ in self._positions())
+
+
+class SnapshotIds(SnapshotMapping):
+    """Union-find ids by label."""
+
+    def _position(self, key: str) -> int:
+        return self._snapshot.find_name(key)
+
+    def _positions(self) -> Iterator[Tuple[str, int]]:
+        snapshot = self._snapshot
+        for id_, name in enumerate(snapshot.names):
+            yield snapshot.string(name), id_
+
+    def _value(self, position: int) -> int:
+        return position
+
+    def _count(self) -> int:
+        return len(self._snapshot.names)
+
+
+class SnapshotRefs(SnapshotIds):
+    """The label each label resolves to."""
+
+    def _position(self, key: str) -> int:
+        id_ = self._snapshot.find_name(key)
+        if id_ == NONE or self._snapshot.refs[id_] == NONE:
+            return NONE
+        return id_
+
+    def _positions(self) -> Iterator[Tuple[str, int]]:
+        refs = self._snapshot.refs
+        for name, id_ in super()._positions():
+            if refs[id_] != NONE:
+                yield name, id_
+
+    def _value(self, position: int) -> str:
+        return self._snapshot.string(self._snapshot.refs[position])
+
+    def _count(self) -> int:
+        return sum(1 for ref in self._snapshot.refs if ref != NONE)
+
+
+class SnapshotNames:
+    """Labels by union-find id, new ones are appended in memory."""
+
+    def __init__(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+        self._added: List[str] = []
+
+    def append(self, value: str):
+        self._added.append(value)
+
+    def __getitem__(self, id_: int) -> str:
+        stored = len(self._snapshot.names)
+        if id_ < stored:
+            return self._snapshot.string(self._snapshot.names[id_])
+        return self._added[id_ - stored]
+
+    def __len__(self) -> int:
+        return len(self._snapshot.names) + len(self._added)
@@ -0,0 +1,73 @@
+"""
+Parsers for the file formats wostools understands.
+
+Each format registers a parser along with a `sniff` function that looks at the
+first characters of a file to tell if it is in that format, so collections can
+pick the right parser without trying them one after the other.
+"""
+
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+# How many characters are read from a file to find out its format
+HEAD_SIZE = 1024
+
+
+class SourceLocation(NamedTuple):
+    """
+    Where the raw text of an article is, to avoid keeping the text around.
+
+    `file` is the position of the file in its collection, `offset` and `length`
+    count characters of the decoded file, or bytes for memory mapped files.
+    """
+
+    file: int
+    offset: int
+    length: int
+
+
+class SourceParser(NamedTuple):
+    """
+    A registered file format.
+
+    `sniff` gets the first characters of a file and tells if they look like the
+    format, `parse` takes the file (rewound), an optional file id, a list of
+    checkpoints and a `RecordFilter`, like `isi.parse_file`, and yields
+    articles.
+    """
+
+    name: str
+    sniff: Callable[[str], bool]
+    parse: Callable[..., Iterable]
+
+
+PARSERS: List[SourceParser] = []
+
+
+def register(name: str, sniff: Callable[[str], bool], parse: Callable[..., Iterable]):
+    """Registers a new file format, formats are sniffed in registration order."""
+    PARSERS.append(SourceParser(name, sniff, parse))
+
+
+def head(file, size: int = HEAD_SIZE) -> str:
+    """Reads the first characters of a file and rewinds it."""
+    if hasattr(file, "head"):
+        return file.head(size)
+    file.seek(0)
+    text = file.read(size)
+    file.seek(0)
+    return text
+
+
+def detect(file) -> Optional[SourceParser]:
+    """Finds the parser for a file by looking at its first characters."""
+    text = head(file).lstrip("\ufeff \t\r\n")
+    for parser in PARSERS:
+        if parser.sniff(text):
+            return parser
+    return None
+
+
+from wostools.sources import isi, scopus  # noqa: E402
+
+register("isi", isi.sniff, isi.parse_file)
+register("scopus", scopus.sniff, scopus.parse_file)
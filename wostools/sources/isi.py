@@ -1,14 +1,121 @@
-from typing import Iterable, TextIO
+import io
+import re
+from bisect import bisect_right
+from typing import Iterable, List, Optional, TextIO, Tuple
+
 from wostools.article import Article
+from wostools.filters import RecordFilter
+from wostools.sources import SourceLocation
+from wostools.sources.mapped import MappedFile
+
+# Records are read in chunks of this many characters, so memory stays bounded by
+# the chunk size plus the longest record instead of the size of the whole file.
+CHUNK_SIZE = 1 << 16
+
+RECORD_SEPARATOR = "\n\n"
+
+# A field tag, as in "FN Clarivate Analytics Web of Science" or "PT J"
+ISI_HEAD_PATTERN = re.compile(r"^(null)?[A-Z0-9]{2}( [^ ]|$)")
+
+# Pairs of (character offset, file.tell() cookie) taken before reading a chunk
+Checkpoints = List[Tuple[int, int]]
+
+
+def sniff(head: str) -> bool:
+    return bool(ISI_HEAD_PATTERN.match(head))
+
+
+def _tell(file) -> Optional[int]:
+    try:
+        return file.tell()
+    except (OSError, io.UnsupportedOperation):
+        return None
+
+
+def _records(
+    file, chunk_size: int = CHUNK_SIZE, checkpoints: Optional[Checkpoints] = None
+) -> Iterable[Tuple[int, str]]:
+    """Yields the records in an ISI file along with their character offset.
+
+    Behaves like ``file.read().split("\\n\\n")`` but only keeps in memory the
+    current chunk and the record that is split across chunk boundaries. If
+    given, `checkpoints` gets a seekable position every chunk.
+    """
+    position = 0
+    remainder = ""
+    while True:
+        if checkpoints is not None:
+            cookie = _tell(file)
+            if cookie is not None:
+                checkpoints.append((position + len(remainder), cookie))
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        *parts, remainder = (remainder + chunk).split(RECORD_SEPARATOR)
+        for part in parts:
+            if part != "ER":
+                yield position, part
+            position += len(part) + len(RECORD_SEPARATOR)
+    if remainder != "ER":
+        yield position, remainder
+
+
+def _split(file, chunk_size: int = CHUNK_SIZE) -> Iterable[str]:
+    for _, part in _records(file, chunk_size):
+        yield part
+
+
+def read_record(
+    file: TextIO, checkpoints: Checkpoints, offset: int, length: int
+) -> str:
+    """Reads back `length` characters at `offset` from the closest checkpoint.
+
+    The file is left where it was, it may be in the middle of being parsed.
+    """
+    index = bisect_right(checkpoints, (offset, float("inf"))) - 1
+    position, cookie = checkpoints[index] if index >= 0 else (0, 0)
+    current = file.tell()
+    try:
+        file.seek(cookie)
+        file.read(offset - position)
+        return file.read(length)
+    finally:
+        file.seek(current)
+
 
+def parse_file(
+    file: TextIO,
+    file_id: Optional[int] = None,
+    checkpoints: Optional[Checkpoints] = None,
+    record_filter: Optional[RecordFilter] = None,
+) -> Iterable[Article]:
+    """Parses the articles in an ISI file.
 
-def _split(file) -> Iterable[str]:
-    parts = file.read().split("\n\n")
-    for part in parts:
-        if part != "ER":
-            yield part
+    When `file_id` is given the articles keep a `SourceLocation` within that
+    file instead of their raw text, `checkpoints` lets you read it back later.
+    Memory mapped files are parsed straight from their index of records.
+    Records left out by `record_filter` are skipped before parsing them.
+    """
+    if isinstance(file, MappedFile):
+        yield from _parse_mapped(file, file_id, record_filter)
+        return
+    for offset, raw in _records(file, checkpoints=checkpoints):
+        if record_filter is not None and not record_filter.accepts_isi(raw):
+            continue
+        source = None
+        if file_id is not None:
+            source = SourceLocation(file_id, offset, len(raw))
+        yield Article.from_isi_text(raw, source=source)
 
 
-def parse_file(file: TextIO) -> Iterable[Article]:
-    for raw in _split(file):
-        yield Article.from_isi_text(raw)
+def _parse_mapped(
+    file: MappedFile, file_id: Optional[int], record_filter: Optional[RecordFilter]
+) -> Iterable[Article]:
+    for offset, length in file.locations():
+        raw = file.decode(offset, length)
+        if record_filter is not None and not record_filter.accepts_isi(raw):
+            continue
+        source = None
+        if file_id is not None:
+            source = SourceLocation(file_id, offset, length)
+        yield Article.from_isi_text(raw, source=source)
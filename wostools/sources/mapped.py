@@ -0,0 +1,85 @@
+"""
+Memory mapped files with an index of the records in them.
+"""
+
+import mmap
+import re
+from array import array
+from typing import Iterator, Sequence, Tuple, Union
+
+RECORD_SEPARATOR = re.compile(rb"\r?\n\r?\n")
+
+
+class MappedFile(Sequence[str]):
+    """
+    A file mapped in memory, seen as a sequence of raw records.
+
+    The byte offsets of every record (the text between blank lines) are found
+    in a single pass when the file is opened, so any record can be decoded
+    straight from the mapped buffer without reading the ones before it, and
+    processes mapping the same file share its pages.
+    """
+
+    def __init__(self, filename: str, encoding: str = "utf-8-sig"):
+        self.name = filename
+        self.encoding = encoding
+        with open(filename, "rb") as file:
+            try:
+                self._map: Union[mmap.mmap, bytes] = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                # Empty files can't be mapped
+                self._map = b""
+        self._offsets = array("Q")
+        self._lengths = array("Q")
+        self._index()
+
+    def _index(self):
+        start = 0
+        for match in RECORD_SEPARATOR.finditer(self._map):
+            self._add(start, match.start())
+            start = match.end()
+        self._add(start, len(self._map))
+
+    def _add(self, start: int, end: int):
+        if end - start != 2 or self._map[start:end] != b"ER":
+            self._offsets.append(start)
+            self._lengths.append(end - start)
+
+    def decode(self, offset: int, length: int) -> str:
+        """Decodes `length` bytes starting at `offset`, as text mode would."""
+        raw = self._map[offset : offset + length]
+        text = raw.decode(self.encoding)
+        if b"\r" in raw:
+            text = text.replace("\r\n", "\n")
+        return text
+
+    def location(self, index: int) -> Tuple[int, int]:
+        """Byte offset and length of a record."""
+        return self._offsets[index], self._lengths[index]
+
+    def locations(self) -> Iterator[Tuple[int, int]]:
+        return zip(self._offsets, self._lengths)
+
+    def __getitem__(self, index: int) -> str:  # type: ignore
+        return self.decode(*self.location(index))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def head(self, size: int) -> str:
+        """At most `size` characters from the start of the file."""
+        return self._map[: size * 4].decode(self.encoding, errors="ignore")[:size]
+
+    def text(self) -> str:
+        """The whole file decoded, for parsers that don't use the index."""
+        return self.decode(0, len(self._map))
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Collections rewind their files, records here are read by offset
+        return 0
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
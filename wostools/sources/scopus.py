@@ -1,14 +1,18 @@
 from collections import defaultdict
+import io
 import logging
 import re
 from typing import Dict, Iterable, List, Optional, TextIO, Tuple
 
 from wostools.article import Article
 from wostools.exceptions import InvalidScopusFile
-
+from wostools.filters import RecordFilter
+from wostools.sources.mapped import MappedFile
 
 logger = logging.getLogger(__name__)
 
+RIS_HEAD_PATTERN = re.compile(r"^[A-Z][A-Z0-9]  - ")
+
 
 def _size(file) -> int:
     file.seek(0, 2)
@@ -84,9 +88,9 @@ def _scopus_ref_to_isi(scopusref: str) -> str:
     parts = {
         "author": f"{first_name} {last_name.replace(' ', '').replace('.', '')}",
         "year": year,
-        "journal": journal.strip().replace(".", "").upper()
-        if not journal.isspace()
-        else None,
+        "journal": (
+            journal.strip().replace(".", "").upper() if not journal.isspace() else None
+        ),
         "volume": volume_info.get("volume"),
         "page": volume_info.get("page"),
         "doi": doi,
@@ -133,7 +137,10 @@ def ris_to_dict(record: str) -> Dict[str, List[str]]:
 
 
 def parse_record(record: str) -> Article:
-    data = ris_to_dict(record)
+    return ris_to_article(ris_to_dict(record))
+
+
+def ris_to_article(data: Dict[str, List[str]]) -> Article:
     return Article(
         title=_joined(data.get("TI")),
         authors=data.get("AU", []),
@@ -150,11 +157,26 @@ def parse_record(record: str) -> Article:
     )
 
 
-def parse_file(file: TextIO) -> Iterable[Article]:
+def sniff(head: str) -> bool:
+    return bool(RIS_HEAD_PATTERN.match(head))
+
+
+def parse_file(
+    file: TextIO,
+    file_id: Optional[int] = None,
+    checkpoints: Optional[list] = None,
+    record_filter: Optional[RecordFilter] = None,
+) -> Iterable[Article]:
+    """Parses the articles in a RIS file, takes the same arguments as
+    `isi.parse_file` but records have no location."""
+    if isinstance(file, MappedFile):
+        file = io.StringIO(file.text())
     if not _size(file):
         return []
     for item in file.read().split("\n\n"):
         if item.isspace():
             continue
-        article = parse_record(item.strip())
-        yield article
+        data = ris_to_dict(item.strip())
+        if record_filter is not None and not record_filter.accepts_ris(data):
+            continue
+        yield ris_to_article(data)
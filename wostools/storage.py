@@ -0,0 +1,262 @@
+"""
+Where collections keep their maps of articles and labels.
+"""
+
+import pickle
+import sqlite3
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+_MISSING = object()
+
+
+class Storage(Protocol):
+    """
+    Makes the maps and lists a collection keeps its articles and labels in.
+
+    `batch_size` is how many articles can wait to be merged at a time, `None`
+    for no limit.
+    """
+
+    batch_size: Optional[int]
+
+    def mapping(self, name: str) -> MutableMapping:
+        """Makes an empty mapping, `name` tells it from the others."""
+
+    def list(self, name: str) -> Any:
+        """Makes an empty list of labels, `name` tells it from the others."""
+
+
+class MemoryStorage:
+    """
+    Plain dicts and lists, as fast as it gets while everything fits in memory.
+    """
+
+    # Articles are merged all at once, which gives the most accurate merges
+    batch_size: Optional[int] = None
+
+    def mapping(self, name: str) -> MutableMapping:
+        return {}
+
+    def list(self, name: str) -> List:
+        return []
+
+
+class SqliteMapping(MutableMapping[Hashable, Any]):
+    """
+    A mapping kept in a table of a SQLite database, values are pickled.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, table: str):
+        self._connection = connection
+        self._table = table
+        # No type affinity, keys keep their type
+        connection.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" (key PRIMARY KEY, value BLOB)'
+        )
+
+    def __getitem__(self, key: Hashable) -> Any:
+        row = self._connection.execute(
+            f'SELECT value FROM "{self._table}" WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return pickle.loads(row[0])
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.update_many([(key, value)])
+
+    def update_many(self, items: List[Tuple[Hashable, Any]]):
+        self._connection.executemany(
+            f'INSERT OR REPLACE INTO "{self._table}" VALUES (?, ?)',
+            (
+                (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                for key, value in items
+            ),
+        )
+
+    def __delitem__(self, key: Hashable):
+        cursor = self._connection.execute(
+            f'DELETE FROM "{self._table}" WHERE key = ?', (key,)
+        )
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return (
+            self._connection.execute(
+                f'SELECT 1 FROM "{self._table}" WHERE key = ?', (key,)
+            ).fetchone()
+            is not None
+        )
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for (key,) in self._connection.execute(
+            f'SELECT key FROM "{self._table}" ORDER BY rowid'
+        ):
+            yield key
+
+    def rows(self) -> Iterator[Tuple[Hashable, Any]]:
+        """All the items in a single query."""
+        for key, value in self._connection.execute(
+            f'SELECT key, value FROM "{self._table}" ORDER BY rowid'
+        ):
+            yield key, pickle.loads(value)
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            f'SELECT COUNT(*) FROM "{self._table}"'
+        ).fetchone()[0]
+
+
+class LRUMapping(MutableMapping[Hashable, Any]):
+    """
+    Keeps the most recently used items of another mapping in memory.
+
+    Changes stay in memory until their items are evicted or `flush` is called,
+    so a mapping that's written over and over only hits the backend once.
+    """
+
+    def __init__(self, backend: SqliteMapping, size: int):
+        self._backend = backend
+        self._size = size
+        self._front: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._dirty: Set[Hashable] = set()
+
+    def _remember(self, key: Hashable, value: Any):
+        self._front[key] = value
+        self._front.move_to_end(key)
+        if len(self._front) <= self._size:
+            return
+        evicted = []
+        while len(self._front) > self._size // 2:
+            old, old_value = self._front.popitem(last=False)
+            if old in self._dirty:
+                self._dirty.discard(old)
+                evicted.append((old, old_value))
+        self._backend.update_many(evicted)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._front.get(key, _MISSING)
+        if value is not _MISSING:
+            self._front.move_to_end(key)
+            return value
+        value = self._backend[key]
+        self._remember(key, value)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self._dirty.add(key)
+        self._remember(key, value)
+
+    def __delitem__(self, key: Hashable):
+        found = self._front.pop(key, _MISSING) is not _MISSING
+        self._dirty.discard(key)
+        try:
+            del self._backend[key]
+        except KeyError:
+            if not found:
+                raise
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._front or key in self._backend
+
+    def flush(self):
+        """Writes the pending changes to the backend."""
+        self._backend.update_many([(key, self._front[key]) for key in self._dirty])
+        self._dirty.clear()
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self.flush()
+        return iter(self._backend)
+
+    def items(self):  # type: ignore
+        # Items in memory are given as they are, so they keep their identity
+        self.flush()
+        for key, value in self._backend.rows():
+            yield key, self._front.get(key, value)
+
+    def values(self):  # type: ignore
+        for _, value in self.items():
+            yield value
+
+    def __len__(self) -> int:
+        self.flush()
+        return len(self._backend)
+
+
+class MappedList:
+    """
+    The append only lists of a collection, on top of a mapping.
+    """
+
+    def __init__(self, mapping: MutableMapping[Hashable, Any]):
+        self._mapping = mapping
+        self._length = 0
+
+    def append(self, value: Any):
+        self._mapping[self._length] = value
+        self._length += 1
+
+    def __getitem__(self, index: int) -> Any:
+        return self._mapping[index]
+
+    def __len__(self) -> int:
+        return self._length
+
+
+class SqliteStorage:
+    """
+    Spills the maps of a collection to a SQLite database.
+
+    Each map keeps `memory` of its most recently used items in memory and the
+    rest on disk, and articles are merged every `memory` articles, so memory
+    use stays bounded no matter how big the collection grows.
+    """
+
+    def __init__(self, path: str = "", memory: int = 1 << 16):
+        """
+        Args:
+            path (str): The database file, a temporary one that goes away
+                with the collection by default. Whatever an earlier
+                collection left in it is dropped.
+            memory (int): Items of each map kept in memory.
+        """
+        self.path = path
+        self.memory = memory
+        self.batch_size: Optional[int] = memory
+        self._connection = sqlite3.connect(path)
+        # Scratch data, it doesn't need to survive a crash
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._mappings: Dict[str, LRUMapping] = {}
+
+    def mapping(self, name: str) -> MutableMapping:
+        # Rows left by an earlier collection don't match its union-find
+        self._connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+        mapping = LRUMapping(SqliteMapping(self._connection, name), self.memory)
+        self._mappings[name] = mapping
+        return mapping
+
+    def list(self, name: str) -> MappedList:
+        return MappedList(self.mapping(name))
+
+    def flush(self):
+        """Writes every pending change to the database."""
+        for mapping in self._mappings.values():
+            mapping.flush()
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
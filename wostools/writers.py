@@ -0,0 +1,308 @@
+"""
+Streaming writers for the cli outputs.
+"""
+
+import bisect
+import csv
+import io
+import itertools
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from wostools.article import Article
+from wostools.graph import CSR
+
+INDENT = 2
+
+# Columns of the article tables, list fields go to side tables
+SCALAR_FIELDS = ("title", "year", "journal", "volume", "issue", "page", "doi")
+LIST_FIELDS = ("authors", "keywords", "references")
+
+# Start of binary edge lists, the digit is the version of the format
+EDGES_MAGIC = b"WOSEDGE1"
+
+# Items encoded per task, in this process or a worker
+CHUNK_SIZE = 1 << 10
+
+Convert = Callable[[Any], Any]
+
+
+def _chunks(items: Iterable[Any], size: int = CHUNK_SIZE) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_map(
+    function: Callable[[Any], Any], tasks: Iterable[Any], jobs: int = 1
+) -> Iterator[Any]:
+    """Maps over tasks in a process pool, yielding the results in order.
+
+    Only a few tasks are sent ahead of the one being consumed, so memory stays
+    bounded. With a single job everything runs in this process, through the
+    same function, which keeps the output the same for any number of jobs.
+    """
+    if jobs <= 1:
+        yield from map(function, tasks)
+        return
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(jobs) as executor:
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            while len(pending) > 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _encode_json(task: Tuple[List[Any], Optional[Convert], bool]) -> str:
+    items, convert, compact = task
+    if convert is not None:
+        items = [convert(item) for item in items]
+    if compact:
+        return ",".join(map(json.JSONEncoder(separators=(",", ":")).encode, items))
+    encoder = json.JSONEncoder(indent=INDENT)
+    padding = " " * INDENT
+    # Strings in JSON never hold a raw new line, it is safe to indent
+    return ",\n".join(
+        padding + encoder.encode(item).replace("\n", "\n" + padding) for item in items
+    )
+
+
+def write_json(
+    items: Iterable[Any],
+    output: TextIO,
+    compact: bool = False,
+    convert: Optional[Convert] = None,
+    jobs: int = 1,
+):
+    """Writes a JSON array a chunk of items at a time.
+
+    The output is the same `json.dump(list(items), output, indent=2)` gives,
+    or the one with the most compact separators, without keeping the items
+    around.
+
+    Args:
+        items (iterable): JSON serializable items.
+        output (TextIO): Where to write the array.
+        compact (bool): Leave out indentation and spaces.
+        convert (callable): Turns each item into a JSON serializable one, it
+            runs along with the encoding so it has to be picklable.
+        jobs (int): Processes encoding chunks of items, the output is the same
+            for any number of them.
+    """
+    separator = "[" if compact else "[\n"
+    empty = True
+    tasks = ((chunk, convert, compact) for chunk in _chunks(items))
+    for text in _ordered_map(_encode_json, tasks, jobs):
+        output.write(separator)
+        output.write(text)
+        separator = "," if compact else ",\n"
+        empty = False
+    if empty:
+        output.write("[]")
+    else:
+        output.write("]" if compact else "\n]")
+
+
+def _encode_jsonl(task: Tuple[List[Any], Optional[Convert], bool]) -> str:
+    items, convert, compact = task
+    if convert is not None:
+        items = [convert(item) for item in items]
+    encoder = json.JSONEncoder(separators=(",", ":") if compact else None)
+    return "".join(encoder.encode(item) + "\n" for item in items)
+
+
+def write_jsonl(
+    items: Iterable[Any],
+    output: TextIO,
+    compact: bool = False,
+    convert: Optional[Convert] = None,
+    jobs: int = 1,
+):
+    """Writes JSON lines, one item per line.
+
+    Args:
+        items (iterable): JSON serializable items.
+        output (TextIO): Where to write the lines.
+        compact (bool): Leave out the spaces after separators.
+        convert (callable): Turns each item into a JSON serializable one.
+        jobs (int): Processes encoding chunks of items.
+    """
+    tasks = ((chunk, convert, compact) for chunk in _chunks(items))
+    for text in _ordered_map(_encode_jsonl, tasks, jobs):
+        output.write(text)
+
+
+def table_names(filename: str) -> Dict[str, str]:
+    """Filenames for the side tables of a table, next to it.
+
+    `articles.csv` gets `articles-authors.csv` and so on.
+    """
+    stem, extension = os.path.splitext(filename)
+    return {field: f"{stem}-{field}{extension}" for field in LIST_FIELDS}
+
+
+def _encode_rows(task: Tuple[List[Article], int, str]) -> Tuple[str, Dict[str, str]]:
+    articles, start, delimiter = task
+    output = io.StringIO()
+    side_outputs = {field: io.StringIO() for field in LIST_FIELDS}
+    writer = csv.writer(output, delimiter=delimiter, lineterminator="\n")
+    side_writers = {
+        field: csv.writer(side_output, delimiter=delimiter, lineterminator="\n")
+        for field, side_output in side_outputs.items()
+    }
+    for id_, article in enumerate(articles, start):
+        writer.writerow((id_, article.label, *_scalars(article)))
+        for field, side_writer in side_writers.items():
+            side_writer.writerows(
+                (id_, position, value)
+                for position, value in enumerate(getattr(article, field))
+            )
+    return output.getvalue(), {
+        field: side_output.getvalue() for field, side_output in side_outputs.items()
+    }
+
+
+def write_tables(
+    articles: Iterable[Article],
+    output: TextIO,
+    side_outputs: Mapping[str, TextIO],
+    delimiter: str = ",",
+    jobs: int = 1,
+):
+    """Writes articles as delimited tables, a chunk of rows at a time.
+
+    The main table has an id, the label and the scalar fields of each article.
+    Each field in `LIST_FIELDS` gets a side table with the article id, the
+    position of the value and the value itself.
+
+    Args:
+        articles (iterable): The articles.
+        output (TextIO): Where to write the main table.
+        side_outputs (Mapping): Where to write the table of each list field.
+        delimiter (str): Column delimiter, like `","` or `"\\t"`.
+        jobs (int): Processes encoding chunks of rows.
+    """
+    writer = csv.writer(output, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(("id", "label", *SCALAR_FIELDS))
+    for field in LIST_FIELDS:
+        csv.writer(
+            side_outputs[field], delimiter=delimiter, lineterminator="\n"
+        ).writerow(("id", "position", field[:-1]))
+    tasks = (
+        (chunk, index * CHUNK_SIZE, delimiter)
+        for index, chunk in enumerate(_chunks(articles))
+    )
+    for text, side_texts in _ordered_map(_encode_rows, tasks, jobs):
+        output.write(text)
+        for field, side_text in side_texts.items():
+            side_outputs[field].write(side_text)
+
+
+def _scalars(article: Article) -> Iterator[Any]:
+    for field in SCALAR_FIELDS:
+        value = getattr(article, field)
+        yield "" if value is None else value
+
+
+def write_nodes(nodes: Iterable[str], output: TextIO, delimiter: str = "\t"):
+    """Writes a table of node ids and labels."""
+    writer = csv.writer(output, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(("id", "label"))
+    writer.writerows(enumerate(nodes))
+
+
+def _edge_chunks(edges: CSR, size: int) -> Iterator[Tuple[int, array, array]]:
+    """Splits rows into chunks of about `size` edges, with their first node."""
+    offsets, indices = edges.offsets, edges.indices
+    start = 0
+    while start < edges.size:
+        end = bisect.bisect_right(offsets, offsets[start] + size, start + 1)
+        end = min(max(end - 1, start + 1), edges.size)
+        yield (
+            start,
+            offsets[start : end + 1],
+            indices[offsets[start] : offsets[end]],
+        )
+        start = end
+
+
+def _edge_pairs(chunk: Tuple[int, array, array]) -> array:
+    start, offsets, indices = chunk
+    pairs = array("q")
+    first = offsets[0]
+    for node in range(len(offsets) - 1):
+        for index in range(offsets[node] - first, offsets[node + 1] - first):
+            pairs.append(start + node)
+            pairs.append(indices[index])
+    return pairs
+
+
+def _encode_edges(task: Tuple[Tuple[int, array, array], str]) -> str:
+    chunk, delimiter = task
+    pairs = _edge_pairs(chunk)
+    return "".join(
+        f"{pairs[index]}{delimiter}{pairs[index + 1]}\n"
+        for index in range(0, len(pairs), 2)
+    )
+
+
+def write_edges(
+    edges: CSR,
+    output: TextIO,
+    delimiter: str = "\t",
+    chunk_size: int = 1 << 16,
+    jobs: int = 1,
+):
+    """Writes a table of integer edges, a chunk of rows at a time."""
+    output.write(f"source{delimiter}target\n")
+    tasks = ((chunk, delimiter) for chunk in _edge_chunks(edges, chunk_size))
+    for text in _ordered_map(_encode_edges, tasks, jobs):
+        output.write(text)
+
+
+def _encode_binary_edges(chunk: Tuple[int, array, array]) -> bytes:
+    pairs = _edge_pairs(chunk)
+    if sys.byteorder == "big":
+        pairs.byteswap()
+    return pairs.tobytes()
+
+
+def write_binary_edges(
+    edges: CSR, output: BinaryIO, chunk_size: int = 1 << 16, jobs: int = 1
+):
+    """Writes integer edges in a compact binary format.
+
+    The format is `EDGES_MAGIC`, the number of edges as an unsigned 64 bit
+    integer and then the source and target of each edge as signed 64 bit
+    integers, all little endian. `numpy.frombuffer(data, "<i8", offset=16)`
+    reads the edges back as a flat array of pairs.
+    """
+    output.write(EDGES_MAGIC)
+    output.write(struct.pack("<Q", len(edges.indices)))
+    chunks = _edge_chunks(edges, chunk_size)
+    for data in _ordered_map(_encode_binary_edges, chunks, jobs):
+        output.write(data)